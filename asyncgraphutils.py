@@ -0,0 +1,215 @@
+"""
+asyncio versions of the GraphUtils queries.
+
+@classes:
+
+AsyncGraphUtils: coroutines that run the GraphUtils traversals in
+batches of yield_every nodes and hand control back to the event loop in
+between, so a big query doesn't stall the other tasks of the loop.
+They can be cancelled like any other task, and every query also takes
+an optional timeout in seconds after which asyncio.TimeoutError is
+raised.
+
+The graph must not be modified while a query is running. Either pass
+a snapshot (graph.freeze()) or use run_in_executor(), which freezes
+the graph and runs the synchronous GraphUtils method in an executor.
+"""
+
+
+import asyncio
+import functools
+import math
+from collections import deque
+from typing import Any, Awaitable, Callable, List, Union
+
+from frozengraph import FrozenGraph
+from graph import Graph
+from graphutils import GraphUtils, PathResult
+
+
+class AsyncGraphUtils:
+    # number of nodes processed between two yields to the event loop
+    _YIELD_EVERY = 1000
+
+    @classmethod
+    async def breadth_first_search(cls, graph: Union[Graph, FrozenGraph],
+                                   node: Any, yield_every: int = _YIELD_EVERY,
+                                   timeout: float = None) -> List:
+        """Returns a list indicating the BFS path rooted at the node"""
+        cls._check_yield_every(yield_every)
+        return await cls._with_timeout(
+            cls._collect(GraphUtils.iter_bfs(graph, node), yield_every,
+                         lambda entry: entry[0]),
+            timeout)
+
+    @classmethod
+    async def depth_first_traversal(cls, graph: Union[Graph, FrozenGraph],
+                                    node: Any, yield_every: int = _YIELD_EVERY,
+                                    timeout: float = None) -> List:
+        """
+        Returns a list with a DFS traversal of the graph starting at node,
+        in the same order as GraphUtils.depth_first_traversal_recursive
+        """
+        cls._check_yield_every(yield_every)
+        return await cls._with_timeout(
+            cls._collect(GraphUtils.iter_dfs(graph, node), yield_every,
+                         lambda entry: entry[0]),
+            timeout)
+
+    @classmethod
+    async def find_components(cls, graph: Union[Graph, FrozenGraph],
+                              yield_every: int = _YIELD_EVERY,
+                              timeout: float = None) -> List[List]:
+        """Return the same components as GraphUtils.find_components"""
+        cls._check_yield_every(yield_every)
+        return await cls._with_timeout(cls._find_components(graph, yield_every),
+                                       timeout)
+
+    @classmethod
+    async def unweighted_shortest_path(cls, graph: Union[Graph, FrozenGraph],
+                                       start: Any, end: Any,
+                                       yield_every: int = _YIELD_EVERY,
+                                       timeout: float = None) -> List:
+        """Return the same path as GraphUtils.unweighted_shortest_path"""
+        cls._check_yield_every(yield_every)
+        if not graph.is_unweighted():
+            raise ValueError('Function only works for unweighted graphs, '
+                             'use dijkstra_shortest_path for weighted graphs.')
+
+        if not (graph.has_node(start) and graph.has_node(end)):
+            raise ValueError(f'Node {start} or node {end} not in graph.')
+
+        return await cls._with_timeout(
+            cls._unweighted_shortest_path(graph, start, end, yield_every),
+            timeout)
+
+    @classmethod
+    async def dijkstra_shortest_path(cls, graph: Union[Graph, FrozenGraph],
+                                     start: Any, end: Any,
+                                     yield_every: int = _YIELD_EVERY,
+                                     timeout: float = None) -> PathResult:
+        """Return the same result as GraphUtils.dijkstra_shortest_path"""
+        cls._check_yield_every(yield_every)
+        if not (graph.has_node(start) and graph.has_node(end)):
+            raise ValueError(f'Node {start} or node {end} not in graph.')
+
+        return await cls._with_timeout(
+            cls._dijkstra_shortest_path(graph, start, end, yield_every),
+            timeout)
+
+    @classmethod
+    async def run_in_executor(cls, method: Callable, graph: Union[Graph, FrozenGraph],
+                              *args: Any, executor: Any = None,
+                              timeout: float = None) -> Any:
+        """
+        Run a synchronous GraphUtils method, e.g. GraphUtils.find_components,
+        in an executor (the loop's default thread pool if None) on a
+        snapshot of the graph taken before the call returns control to the
+        loop. The graph can be modified while the query runs. Cancelling
+        the call or timing out stops waiting for the result, but the
+        method itself runs to completion in the executor.
+        """
+        snapshot = graph if isinstance(graph, FrozenGraph) else graph.freeze()
+        loop = asyncio.get_running_loop()
+
+        return await cls._with_timeout(
+            loop.run_in_executor(executor, functools.partial(method, snapshot, *args)),
+            timeout)
+
+    @classmethod
+    def _check_yield_every(cls, yield_every: int) -> None:
+        if yield_every < 1:
+            raise ValueError('yield_every must be at least 1, not '
+                             f'{yield_every}.')
+
+    @classmethod
+    async def _with_timeout(cls, awaitable: Awaitable, timeout: float) -> Any:
+        if timeout is None:
+            return await awaitable
+
+        return await asyncio.wait_for(awaitable, timeout)
+
+    @classmethod
+    async def _collect(cls, entries, yield_every: int,
+                       transform: Callable) -> List:
+        """Consume a generator into a list, yielding every yield_every items"""
+        result = []
+        for entry in entries:
+            result.append(transform(entry))
+            if len(result) % yield_every == 0:
+                await asyncio.sleep(0)
+
+        return result
+
+    @classmethod
+    async def _find_components(cls, graph: Union[Graph, FrozenGraph],
+                               yield_every: int) -> List[List]:
+        visited = bytearray(graph.id_bound())
+        neighbor_ids = GraphUtils._component_neighbor_ids(graph)
+        components = []
+        processed = 0
+
+        for node in graph.node_ids():
+            if visited[node]:
+                continue
+
+            component = []
+            for value in GraphUtils._iter_preorder(graph, node, visited,
+                                                   neighbor_ids):
+                component.append(value)
+                processed += 1
+                if processed % yield_every == 0:
+                    await asyncio.sleep(0)
+
+            components.append(component)
+
+        return components
+
+    @classmethod
+    async def _unweighted_shortest_path(cls, graph: Union[Graph, FrozenGraph],
+                                        start: Any, end: Any,
+                                        yield_every: int) -> List:
+        """Same early exit BFS as GraphUtils._get_prev_table"""
+        start_id = graph.node_id(start)
+        end_id = graph.node_id(end)
+        prev_table = [-1] * graph.id_bound()
+        visited = bytearray(graph.id_bound())
+        visited[start_id] = 1
+        queue = deque([start_id])
+        processed = 0
+
+        while len(queue) > 0 and not visited[end_id]:
+            current = queue.popleft()
+
+            for neighbor in graph.neighbor_ids(current):
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    prev_table[neighbor] = current
+                    queue.append(neighbor)
+
+            processed += 1
+            if processed % yield_every == 0:
+                await asyncio.sleep(0)
+
+        return GraphUtils._reconstruct_path(graph, start_id, end_id, prev_table)
+
+    @classmethod
+    async def _dijkstra_shortest_path(cls, graph: Union[Graph, FrozenGraph],
+                                      start: Any, end: Any,
+                                      yield_every: int) -> PathResult:
+        start_id = graph.node_id(start)
+        end_id = graph.node_id(end)
+        prev_table = [-1] * graph.id_bound()
+        expanded = 0
+
+        for node, distance in GraphUtils._dijkstra(graph, start_id, prev_table):
+            expanded += 1
+            if node == end_id:
+                path = GraphUtils._reconstruct_path(graph, start_id, end_id,
+                                                    prev_table)
+                return PathResult(path, distance, expanded)
+
+            if expanded % yield_every == 0:
+                await asyncio.sleep(0)
+
+        return PathResult([], math.inf, expanded)
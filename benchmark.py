@@ -0,0 +1,698 @@
+"""
+Benchmarks for GraphUtils, TreeUtils and Maze on synthetic inputs.
+
+@classes:
+
+Generators: seeded generators for Erdos-Renyi, power-law (preferential
+attachment), grid and path graphs, random/deep/bushy trees and random
+mazes. The same seed always produces the same input.
+
+Benchmark: runs every case on inputs of the requested sizes and reports
+the best wall clock time, the peak traced memory and the number of input
+nodes (maze cells) processed per second. Results can be written to a
+baseline JSON file and later runs compared against it.
+
+Usage:
+    python benchmark.py --sizes 1000 10000 --save-baseline baseline.json
+    python benchmark.py --sizes 1000 10000 --baseline baseline.json
+
+The second command exits with status 1 when a case got slower or used
+more memory than the baseline allows (--tolerance, 25% by default).
+Peak memory only covers the Python heap of this process, the workers of
+the multi process cases aren't traced.
+"""
+
+
+import argparse
+import io
+import json
+import math
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+from graph import DirectedGraph, Graph
+from graphutils import GraphUtils
+from maze import Maze
+from tree import BinaryTree, Tree
+from treeutils import TreeUtils
+
+
+class Generators:
+    # average degree of the random graphs
+    AVERAGE_DEGREE = 4
+    # edges added with every node of a power-law graph
+    ATTACHMENT_EDGES = 2
+    # children per node of a bushy tree
+    BUSHY_FANOUT = 64
+    # number of most recent nodes a node of a deep tree can hang under
+    DEEP_WINDOW = 2
+    # share of rock cells in a random open floor maze
+    ROCK_DENSITY = 0.3
+
+    @classmethod
+    def erdos_renyi(cls, size: int, seed: int, weighted: bool = False,
+                    directed: bool = False) -> Graph:
+        """
+        Return a G(n, m) random graph with size nodes and
+        size * AVERAGE_DEGREE / 2 edges picked uniformly at random.
+        Weighted graphs get random integer weights in [1, 100].
+        """
+        rng = random.Random(seed)
+        graph = DirectedGraph(unweighted=not weighted) if directed \
+            else Graph(unweighted=not weighted)
+        graph.add_nodes_from(range(size))
+
+        edges = []
+        for _ in range(size * cls.AVERAGE_DEGREE // 2):
+            edge = (rng.randrange(size), rng.randrange(size))
+            if weighted:
+                edge += (rng.randint(1, 100),)
+            edges.append(edge)
+
+        graph.add_edges_from(edges)
+        return graph
+
+    @classmethod
+    def power_law(cls, size: int, seed: int) -> Graph:
+        """
+        Return a Barabasi-Albert graph, every new node links to
+        ATTACHMENT_EDGES existing nodes picked with probability proportional
+        to their degree.
+        """
+        rng = random.Random(seed)
+        graph = Graph()
+        graph.add_nodes_from(range(size))
+
+        # every node appears once per edge end, sampling from this list
+        # picks nodes proportionally to their degree
+        endpoints = list(range(min(size, cls.ATTACHMENT_EDGES + 1)))
+        edges = []
+        for node in range(len(endpoints), size):
+            for _ in range(cls.ATTACHMENT_EDGES):
+                target = rng.choice(endpoints)
+                edges.append((node, target))
+                endpoints.append(target)
+            endpoints.extend([node] * cls.ATTACHMENT_EDGES)
+
+        graph.add_edges_from(edges)
+        return graph
+
+    @classmethod
+    def grid(cls, size: int, seed: int, weighted: bool = False) -> Graph:
+        """
+        Return a square 4-connected grid graph with about size nodes. The
+        node at row r and column c has the value r * columns + c.
+        """
+        rng = random.Random(seed)
+        side = max(1, math.isqrt(size))
+        graph = Graph(unweighted=not weighted)
+        graph.add_nodes_from(range(side * side))
+
+        edges = []
+        for row in range(side):
+            for col in range(side):
+                node = row * side + col
+                if col + 1 < side:
+                    edges.append((node, node + 1))
+                if row + 1 < side:
+                    edges.append((node, node + side))
+
+        if weighted:
+            edges = [edge + (rng.randint(1, 100),) for edge in edges]
+
+        graph.add_edges_from(edges)
+        return graph
+
+    @classmethod
+    def path(cls, size: int, seed: int) -> Graph:
+        """Return a path graph 0 - 1 - ... - size - 1"""
+        graph = Graph()
+        graph.add_nodes_from(range(size))
+        graph.add_edges_from((node, node + 1) for node in range(size - 1))
+        return graph
+
+    @classmethod
+    def dag(cls, size: int, seed: int) -> DirectedGraph:
+        """Return a random DAG, every edge points from a lower to a higher node"""
+        rng = random.Random(seed)
+        graph = DirectedGraph()
+        graph.add_nodes_from(range(size))
+
+        edges = []
+        for _ in range(size * cls.AVERAGE_DEGREE // 2):
+            first, second = rng.randrange(size), rng.randrange(size)
+            if first != second:
+                edges.append((min(first, second), max(first, second)))
+
+        graph.add_edges_from(edges)
+        return graph
+
+    @classmethod
+    def tree_parents(cls, size: int, shape: str, seed: int) -> List[int]:
+        """
+        Return a list where parents[node] is the parent of node in a tree of
+        the given shape, the root 0 has the parent -1.
+
+        'random': every node hangs under a uniformly random earlier node
+        'deep': every node hangs under one of the DEEP_WINDOW previous nodes
+        'bushy': every node has up to BUSHY_FANOUT children
+        """
+        rng = random.Random(seed)
+        parents = [-1]
+
+        for node in range(1, size):
+            if shape == 'random':
+                parents.append(rng.randrange(node))
+            elif shape == 'deep':
+                parents.append(max(0, node - rng.randint(1, cls.DEEP_WINDOW)))
+            elif shape == 'bushy':
+                parents.append((node - 1) // cls.BUSHY_FANOUT)
+            else:
+                raise ValueError(f'Unknown tree shape {shape}.')
+
+        return parents
+
+    @classmethod
+    def tree_graph(cls, size: int, shape: str, seed: int) -> Graph:
+        """Return a tree of the given shape as an undirected Graph"""
+        parents = cls.tree_parents(size, shape, seed)
+        graph = Graph()
+        graph.add_nodes_from(range(size))
+        graph.add_edges_from((node, parents[node]) for node in range(1, size))
+        return graph
+
+    @classmethod
+    def rooted_tree(cls, size: int, shape: str, seed: int) -> Tree:
+        """Return a tree of the given shape as a Tree rooted at 0"""
+        parents = cls.tree_parents(size, shape, seed)
+        tree = Tree(0)
+        for node in range(1, size):
+            tree.add_node(node)
+            tree.add_children(parents[node], node)
+
+        return tree
+
+    @classmethod
+    def binary_tree(cls, size: int, shape: str, seed: int) -> BinaryTree:
+        """
+        Return a BinaryTree with nodes 0 .. size - 1.
+
+        'random': every node takes a uniformly random free child slot
+        'deep': every node is a random child of the previous node
+        'bushy': complete binary tree, node i has the children 2i+1 and 2i+2
+        """
+        rng = random.Random(seed)
+        tree = BinaryTree(0)
+        free_slots = [(0, False), (0, True)]
+
+        for node in range(1, size):
+            if shape == 'random':
+                i = rng.randrange(len(free_slots))
+                free_slots[i], free_slots[-1] = free_slots[-1], free_slots[i]
+                parent, right = free_slots.pop()
+                free_slots += [(node, False), (node, True)]
+            elif shape == 'deep':
+                parent, right = node - 1, rng.random() < 0.5
+            elif shape == 'bushy':
+                parent, right = (node - 1) // 2, node % 2 == 0
+            else:
+                raise ValueError(f'Unknown tree shape {shape}.')
+
+            if right:
+                tree.add_right_child(parent, node)
+            else:
+                tree.add_left_child(parent, node)
+
+        return tree
+
+    @classmethod
+    def maze(cls, size: int, shape: str, seed: int) -> List[str]:
+        """
+        Return the rows of a square maze with about size cells, S in the top
+        left and E in the bottom right corner. There is always a path from S
+        to E.
+
+        'open': open floor with ROCK_DENSITY random rocks and a random
+        staircase corridor carved from S to E
+        'corridors': a perfect maze carved by a randomized DFS, every pair
+        of cells is connected by exactly one path
+        """
+        rng = random.Random(seed)
+        # odd side so the carved corridors end on the last row and column
+        side = max(3, math.isqrt(size)) | 1
+
+        if shape == 'open':
+            grid = [[Maze.ROCK_SYMBOL if rng.random() < cls.ROCK_DENSITY
+                     else Maze.PATH_SYMBOL for _ in range(side)]
+                    for _ in range(side)]
+            row = col = 0
+            while (row, col) != (side - 1, side - 1):
+                grid[row][col] = Maze.PATH_SYMBOL
+                if col == side - 1 or (row < side - 1 and rng.random() < 0.5):
+                    row += 1
+                else:
+                    col += 1
+        elif shape == 'corridors':
+            grid = [[Maze.ROCK_SYMBOL] * side for _ in range(side)]
+            grid[0][0] = Maze.PATH_SYMBOL
+            stack = [(0, 0)]
+            while len(stack) > 0:
+                row, col = stack[-1]
+                steps = [(row + dr, col + dc, row + dr // 2, col + dc // 2)
+                         for dr, dc in ((-2, 0), (2, 0), (0, -2), (0, 2))
+                         if 0 <= row + dr < side and 0 <= col + dc < side
+                         and grid[row + dr][col + dc] == Maze.ROCK_SYMBOL]
+                if len(steps) == 0:
+                    stack.pop()
+                    continue
+
+                row, col, wall_row, wall_col = rng.choice(steps)
+                grid[wall_row][wall_col] = Maze.PATH_SYMBOL
+                grid[row][col] = Maze.PATH_SYMBOL
+                stack.append((row, col))
+        else:
+            raise ValueError(f'Unknown maze shape {shape}.')
+
+        grid[0][0] = Maze.START_SYMBOL
+        grid[side - 1][side - 1] = Maze.END_SYMBOL
+        return [''.join(row) for row in grid]
+
+    @classmethod
+    def maze_file(cls, size: int, shape: str, seed: int, directory: str) -> str:
+        """Write a maze() to a file in directory and return its path"""
+        path = os.path.join(directory, f'maze_{shape}_{size}_{seed}.txt')
+        with open(path, mode='w') as f:
+            f.write('\n'.join(cls.maze(size, shape, seed)) + '\n')
+
+        return path
+
+
+class Case(NamedTuple):
+    # name the results are reported and stored under
+    name: str
+    # setup(size, seed, directory) returns (args, nodes), the positional
+    # arguments of run and the number of input nodes they cover
+    setup: Callable[[int, int, str], Tuple[Tuple, int]]
+    run: Callable[..., Any]
+
+
+class Result(NamedTuple):
+    seconds: float
+    peak_bytes: int
+    nodes_per_second: float
+
+
+def _grid_manhattan(side: int) -> Callable[[int, int], int]:
+    """A* heuristic for Generators.grid() graphs, scaled to the lowest weight"""
+    def heuristic(value: int, goal: int) -> int:
+        row, col = divmod(value, side)
+        goal_row, goal_col = divmod(goal, side)
+        return abs(row - goal_row) + abs(col - goal_col)
+
+    return heuristic
+
+
+def _first_node(graph: Graph) -> Tuple:
+    """Start at node 0"""
+    return (0,)
+
+
+def _no_arguments(graph: Graph) -> Tuple:
+    """Whole graph cases only take the graph"""
+    return ()
+
+
+def _graph_setup(generator: Callable, *args: Any, frozen: bool = False,
+                 extra: Callable[[Graph], Tuple] = _first_node
+                 ) -> Callable[[int, int, str], Tuple[Tuple, int]]:
+    """
+    Return a Case setup that builds generator(size, seed, *args) and passes
+    (graph, *extra(graph)) to the case, extra defaults to the start node 0.
+    """
+    def setup(size: int, seed: int, directory: str) -> Tuple[Tuple, int]:
+        graph = generator(size, seed, *args)
+        arguments = (graph,) + tuple(extra(graph))
+        if frozen:
+            arguments = (graph.freeze(),) + arguments[1:]
+
+        return arguments, graph.size()
+
+    return setup
+
+
+def _last_node(graph: Graph) -> Tuple:
+    """Start at node 0 and end at the node added last"""
+    return 0, graph.size() - 1
+
+
+def _sources(count: int) -> Callable[[Graph], Tuple]:
+    """Pass count evenly spread source nodes"""
+    def extra(graph: Graph) -> Tuple:
+        step = max(1, graph.size() // count)
+        return (list(range(0, graph.size(), step))[:count],)
+
+    return extra
+
+
+class Benchmark:
+    # default number of input nodes of each case
+    SIZES = (1_000, 10_000, 100_000)
+    GRAPH_SHAPES = {
+        'erdos_renyi': Generators.erdos_renyi,
+        'power_law': Generators.power_law,
+        'grid': Generators.grid,
+        'path': Generators.path,
+    }
+    TREE_SHAPES = ('random', 'deep', 'bushy')
+    MAZE_SHAPES = ('open', 'corridors')
+    # sources of the multi source and all pairs cases, these run one BFS
+    # per source so the source count is fixed instead of growing with size
+    SOURCES = 16
+    # relative slow down (and memory growth) tolerated by compare()
+    TOLERANCE = 0.25
+
+    @classmethod
+    def cases(cls) -> List[Case]:
+        """Return every benchmark case"""
+        cases = []
+
+        for shape, generator in cls.GRAPH_SHAPES.items():
+            for method, extra in ((GraphUtils.depth_first_traversal_iterative, _first_node),
+                                  (GraphUtils.depth_first_traversal_recursive, _first_node),
+                                  (GraphUtils.breadth_first_search, _first_node),
+                                  (GraphUtils.find_components, _no_arguments)):
+                cases.append(Case(f'GraphUtils.{method.__name__}[{shape}]',
+                                  _graph_setup(generator, extra=extra), method))
+                cases.append(Case(f'GraphUtils.{method.__name__}[{shape},frozen]',
+                                  _graph_setup(generator, frozen=True, extra=extra),
+                                  method))
+
+            cases.append(Case(f'GraphUtils.iter_bfs[{shape}]', _graph_setup(generator),
+                              lambda graph, start: sum(1 for _ in GraphUtils.iter_bfs(graph, start))))
+            cases.append(Case(f'GraphUtils.iter_dfs[{shape}]', _graph_setup(generator),
+                              lambda graph, start: sum(1 for _ in GraphUtils.iter_dfs(graph, start))))
+            cases.append(Case(f'GraphUtils.iter_components[{shape}]',
+                              _graph_setup(generator, extra=_no_arguments),
+                              lambda graph: sum(1 for _ in GraphUtils.iter_components(graph))))
+            cases.append(Case(f'GraphUtils.unweighted_shortest_path[{shape}]',
+                              _graph_setup(generator, extra=_last_node),
+                              GraphUtils.unweighted_shortest_path))
+            cases.append(Case(f'GraphUtils.unweighted_shortest_path[{shape},bidirectional]',
+                              _graph_setup(generator, extra=_last_node),
+                              lambda graph, start, end: GraphUtils.unweighted_shortest_path(
+                                  graph, start, end, bidirectional=True)))
+            cases.append(Case(f'GraphUtils.bfs_levels[{shape}]',
+                              _graph_setup(generator, frozen=True),
+                              GraphUtils.bfs_levels))
+
+        cases.append(Case('GraphUtils.unweighted_shortest_path[erdos_renyi,cached]',
+                          _graph_setup(Generators.erdos_renyi, extra=_last_node),
+                          cls._cached_shortest_path))
+        cases.append(Case('GraphUtils.multi_source_distances[erdos_renyi]',
+                          _graph_setup(Generators.erdos_renyi, extra=_sources(cls.SOURCES)),
+                          GraphUtils.multi_source_distances))
+        cases.append(Case('GraphUtils.multi_source_distances[erdos_renyi,workers]',
+                          _graph_setup(Generators.erdos_renyi, extra=_sources(cls.SOURCES)),
+                          lambda graph, sources: GraphUtils.multi_source_distances(
+                              graph, sources, workers=2)))
+        cases.append(Case('GraphUtils.all_pairs_unweighted[erdos_renyi]',
+                          _graph_setup(Generators.erdos_renyi, extra=_sources(cls.SOURCES)),
+                          lambda graph, sources: sum(1 for _ in GraphUtils.all_pairs_unweighted(
+                              graph, sources=sources))))
+
+        for shape, generator in (('erdos_renyi', Generators.erdos_renyi),
+                                 ('grid', Generators.grid)):
+            for frozen in (False, True):
+                label = f'{shape},weighted,frozen' if frozen else f'{shape},weighted'
+                setup = _graph_setup(generator, True, frozen=frozen, extra=_last_node)
+                cases.append(Case(f'GraphUtils.dijkstra_shortest_path[{label}]', setup,
+                                  GraphUtils.dijkstra_shortest_path))
+                cases.append(Case(f'GraphUtils.dijkstra_distances[{label}]',
+                                  _graph_setup(generator, True, frozen=frozen),
+                                  GraphUtils.dijkstra_distances))
+                cases.append(Case(f'GraphUtils.k_nearest[{label}]',
+                                  _graph_setup(generator, True, frozen=frozen,
+                                               extra=lambda graph: (0, cls.SOURCES)),
+                                  GraphUtils.k_nearest))
+                cases.append(Case(f'GraphUtils.minimum_spanning_forest[{label},kruskal]',
+                                  _graph_setup(generator, True, frozen=frozen,
+                                               extra=lambda graph: ('kruskal',)),
+                                  GraphUtils.minimum_spanning_forest))
+                cases.append(Case(f'GraphUtils.minimum_spanning_forest[{label},prim]',
+                                  _graph_setup(generator, True, frozen=frozen,
+                                               extra=lambda graph: ('prim',)),
+                                  GraphUtils.minimum_spanning_forest))
+
+        cases.append(Case('GraphUtils.a_star[grid,weighted]',
+                          _graph_setup(Generators.grid, True, extra=lambda graph: (
+                              0, graph.size() - 1, _grid_manhattan(math.isqrt(graph.size())))),
+                          GraphUtils.a_star))
+        cases.append(Case('GraphUtils.a_star[erdos_renyi,weighted,zero]',
+                          _graph_setup(Generators.erdos_renyi, True, extra=lambda graph: (
+                              0, graph.size() - 1, lambda value, goal: 0)),
+                          GraphUtils.a_star))
+
+        for frozen in (False, True):
+            label = 'erdos_renyi,directed,frozen' if frozen else 'erdos_renyi,directed'
+            setup = _graph_setup(Generators.erdos_renyi, False, True, frozen=frozen,
+                                 extra=_no_arguments)
+            cases.append(Case(f'GraphUtils.strongly_connected_components[{label}]',
+                              setup, GraphUtils.strongly_connected_components))
+            cases.append(Case(f'GraphUtils.condensation[{label}]', setup,
+                              GraphUtils.condensation))
+        cases.append(Case('GraphUtils.topological_sort[dag]',
+                          _graph_setup(Generators.dag, extra=_no_arguments),
+                          GraphUtils.topological_sort))
+
+        for shape in cls.TREE_SHAPES:
+            cases.append(Case(f'TreeUtils.leaf_nodes_sum[{shape}]',
+                              cls._tree_setup(Generators.rooted_tree, shape),
+                              TreeUtils.leaf_nodes_sum))
+            cases.append(Case(f'TreeUtils.height_of_tree[{shape}]',
+                              cls._tree_setup(Generators.binary_tree, shape),
+                              TreeUtils.height_of_tree))
+            cases.append(Case(f'TreeUtils.root_tree_on_node[{shape}]',
+                              cls._tree_setup(Generators.tree_graph, shape, 0),
+                              TreeUtils.root_tree_on_node))
+            cases.append(Case(f'TreeUtils.get_center_nodes[{shape}]',
+                              cls._tree_setup(Generators.tree_graph, shape),
+                              TreeUtils.get_center_nodes))
+            cases.append(Case(f'TreeUtils.are_isomorphic[{shape}]',
+                              cls._isomorphic_setup(shape),
+                              TreeUtils.are_isomorphic))
+
+        for shape in cls.MAZE_SHAPES:
+            for backend in Maze.BACKENDS:
+                label = f'{shape},{backend}'
+                cases.append(Case(f'Maze.__init__[{label}]',
+                                  cls._maze_setup(shape, backend),
+                                  lambda path, backend: Maze(path, backend)))
+                # A* and JPS run the same code on both backends
+                for algorithm in Maze.ALGORITHMS if backend == 'bytes' else ('bfs',):
+                    cases.append(Case(f'Maze.find_shortest_path[{label},{algorithm}]',
+                                      cls._maze_setup(shape, backend, algorithm,
+                                                      load=True),
+                                      Maze.find_shortest_path))
+                cases.append(Case(f'Maze.render[{label}]',
+                                  cls._maze_setup(shape, backend, load=True,
+                                                  solve=True),
+                                  Maze.render))
+                cases.append(Case(f'Maze.write[{label}]',
+                                  cls._maze_setup(shape, backend, load=True,
+                                                  solve=True),
+                                  lambda maze, result: maze.write(io.StringIO(), result)))
+                cases.append(Case(f'Maze.precompute_exit_paths[{label}]',
+                                  cls._maze_setup(shape, backend, load=True),
+                                  Maze.precompute_exit_paths))
+                cases.append(Case(f'Maze.shortest_path_from[{label}]',
+                                  cls._maze_setup(shape, backend, load=True,
+                                                  precompute=True),
+                                  lambda maze: maze.shortest_path_from(0, 0)))
+
+        return cases
+
+    @classmethod
+    def _cached_shortest_path(cls, graph: Graph, start: Any, end: Any) -> List:
+        """Path query answered from a warm path cache"""
+        GraphUtils.enable_path_cache()
+        try:
+            GraphUtils.unweighted_shortest_path(graph, start, end)
+            return GraphUtils.unweighted_shortest_path(graph, start, end)
+        finally:
+            GraphUtils.disable_path_cache()
+
+    @classmethod
+    def _tree_setup(cls, generator: Callable, shape: str, *extra: Any
+                    ) -> Callable[[int, int, str], Tuple[Tuple, int]]:
+        def setup(size: int, seed: int, directory: str) -> Tuple[Tuple, int]:
+            return (generator(size, shape, seed),) + extra, size
+
+        return setup
+
+    @classmethod
+    def _isomorphic_setup(cls, shape: str
+                          ) -> Callable[[int, int, str], Tuple[Tuple, int]]:
+        """Compare a tree with a relabeled copy of itself, the worst case"""
+        def setup(size: int, seed: int, directory: str) -> Tuple[Tuple, int]:
+            tree = Generators.tree_graph(size, shape, seed)
+            labels = list(range(size))
+            random.Random(seed).shuffle(labels)
+            parents = Generators.tree_parents(size, shape, seed)
+            relabeled = Graph()
+            relabeled.add_nodes_from(labels)
+            relabeled.add_edges_from((labels[node], labels[parents[node]])
+                                     for node in range(1, size))
+            return (tree, relabeled), 2 * size
+
+        return setup
+
+    @classmethod
+    def _maze_setup(cls, shape: str, backend: str, *extra: Any,
+                    load: bool = False, precompute: bool = False,
+                    solve: bool = False
+                    ) -> Callable[[int, int, str], Tuple[Tuple, int]]:
+        def setup(size: int, seed: int, directory: str) -> Tuple[Tuple, int]:
+            path = Generators.maze_file(size, shape, seed, directory)
+            maze = Maze(path, backend)
+            if precompute:
+                maze.precompute_exit_paths()
+            if solve:
+                extra_args = (maze.find_shortest_path(),)
+            else:
+                extra_args = extra
+            cells = maze._NUM_ROWS * maze._NUM_COLS
+            return ((maze,) if load else (path, backend)) + extra_args, cells
+
+        return setup
+
+    @classmethod
+    def run(cls, sizes: Tuple[int, ...] = SIZES, seed: int = 0,
+            repeat: int = 3, pattern: str = '', output: Any = sys.stdout
+            ) -> Dict[str, Dict]:
+        """
+        Run every case whose name contains pattern on inputs of each size.
+        Print a line per result to output and return a dictionary mapping
+        'name@size' to the measurements, failed cases map to the error.
+        """
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for case in cls.cases():
+                if pattern not in case.name:
+                    continue
+
+                for size in sizes:
+                    key = f'{case.name}@{size}'
+                    try:
+                        result = cls.measure(case, size, seed, repeat, directory)
+                    except Exception as error:
+                        results[key] = {'error': type(error).__name__}
+                        print(f'{key:<80} {type(error).__name__}', file=output)
+                        continue
+
+                    results[key] = result._asdict()
+                    print(f'{key:<80} {result.seconds * 1000:>10.2f} ms '
+                          f'{result.peak_bytes / 2 ** 20:>9.2f} MiB '
+                          f'{result.nodes_per_second:>14,.0f} nodes/s',
+                          file=output)
+                    output.flush()
+
+        return results
+
+    @classmethod
+    def measure(cls, case: Case, size: int, seed: int, repeat: int,
+                directory: str) -> Result:
+        """
+        Return the best time of repeat runs of the case and its peak memory.
+        Every run gets a freshly built input so runs that modify their
+        input or warm up caches don't skew the later ones.
+        """
+        best = math.inf
+        for _ in range(repeat):
+            args, nodes = case.setup(size, seed, directory)
+            start = time.perf_counter()
+            case.run(*args)
+            best = min(best, time.perf_counter() - start)
+
+        # memory is traced in a separate run, tracing slows the code down
+        args, nodes = case.setup(size, seed, directory)
+        tracemalloc.start()
+        try:
+            case.run(*args)
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+
+        return Result(best, peak, nodes / best if best > 0 else math.inf)
+
+    @classmethod
+    def save_baseline(cls, results: Dict[str, Dict], path: str) -> None:
+        with open(path, mode='w') as f:
+            json.dump({'python': sys.version.split()[0], 'results': results},
+                      f, indent=2, sort_keys=True)
+
+    @classmethod
+    def compare(cls, results: Dict[str, Dict], path: str,
+                tolerance: float = TOLERANCE) -> List[str]:
+        """
+        Return a description of every result that is more than tolerance
+        slower, uses more than tolerance more memory or fails where the
+        baseline in path succeeded. Cases missing from the baseline are
+        skipped.
+        """
+        with open(path, mode='r') as f:
+            baseline = json.load(f)['results']
+
+        regressions = []
+        for key, result in results.items():
+            expected = baseline.get(key)
+            if expected is None or 'error' in expected:
+                continue
+
+            if 'error' in result:
+                regressions.append(f'{key}: {result["error"]}, baseline passed')
+                continue
+
+            for metric in ('seconds', 'peak_bytes'):
+                if result[metric] > expected[metric] * (1 + tolerance):
+                    regressions.append(f'{key}: {metric} {result[metric]:.6g} '
+                                       f'vs baseline {expected[metric]:.6g}')
+
+        return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0].strip())
+    parser.add_argument('--sizes', type=int, nargs='+', default=Benchmark.SIZES,
+                        help='input sizes in nodes (maze cells)')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--repeat', type=int, default=3,
+                        help='runs per case, the best time is reported')
+    parser.add_argument('--filter', default='',
+                        help='only run cases whose name contains this string')
+    parser.add_argument('--baseline', help='baseline JSON to compare against')
+    parser.add_argument('--save-baseline', help='write the results to this JSON')
+    parser.add_argument('--tolerance', type=float, default=Benchmark.TOLERANCE)
+    args = parser.parse_args(argv)
+
+    results = Benchmark.run(tuple(args.sizes), args.seed, args.repeat, args.filter)
+
+    if args.save_baseline:
+        Benchmark.save_baseline(results, args.save_baseline)
+
+    if args.baseline:
+        regressions = Benchmark.compare(results, args.baseline, args.tolerance)
+        for regression in regressions:
+            print(f'REGRESSION {regression}')
+        if len(regressions) > 0:
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
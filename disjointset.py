@@ -0,0 +1,76 @@
+"""
+Union-find (disjoint set) data structure over integer elements.
+
+@classes:
+
+DisjointSet: keeps track of a partition of integer ids into disjoint
+sets. Uses path compression and union by rank so find and union run in
+near constant amortized time.
+"""
+
+
+class DisjointSet:
+    '''
+    Disjoint sets of integer ids. Elements 0 .. size - 1 start out in sets
+    of their own, more elements can be added later with add().
+    '''
+
+    def __init__(self, size: int = 0):
+        self._parent = list(range(size))
+        self._rank = [0] * size
+        self._count = size
+
+    def add(self, element: int) -> None:
+        """Put element in a new set of its own"""
+        if element >= len(self._parent):
+            grow = element + 1 - len(self._parent)
+            self._parent.extend(range(len(self._parent), element + 1))
+            self._rank.extend([0] * grow)
+        else:
+            self._parent[element] = element
+            self._rank[element] = 0
+
+        self._count += 1
+
+    def find(self, element: int) -> int:
+        """Return the representative element of the set element is in"""
+        parent = self._parent
+        root = element
+        while parent[root] != root:
+            root = parent[root]
+
+        # path compression, point every element on the way at the root
+        while parent[element] != root:
+            parent[element], element = root, parent[element]
+
+        return root
+
+    def union(self, first: int, second: int) -> bool:
+        """
+        Merge the sets first and second are in. Return False if they were
+        already in the same set.
+        """
+        first_root = self.find(first)
+        second_root = self.find(second)
+
+        if first_root == second_root:
+            return False
+
+        # union by rank, hang the shallower tree under the deeper one
+        if self._rank[first_root] < self._rank[second_root]:
+            first_root, second_root = second_root, first_root
+
+        self._parent[second_root] = first_root
+        if self._rank[first_root] == self._rank[second_root]:
+            self._rank[first_root] += 1
+
+        self._count -= 1
+        return True
+
+    def connected(self, first: int, second: int) -> bool:
+        return self.find(first) == self.find(second)
+
+    @property
+    def count(self) -> int:
+        """Return the number of disjoint sets"""
+        return self._count
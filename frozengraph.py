@@ -0,0 +1,333 @@
+"""
+Read-only compressed sparse row (CSR) snapshot of a graph.
+
+@classes:
+
+FrozenGraph: immutable graph whose adjacency lists are stored in flat
+integer arrays. It is created by calling freeze() on a Graph or a
+DirectedGraph and can be passed to the GraphUtils traversals.
+
+Snapshots can be written to a compact binary file with save() and read
+back with FrozenGraph.load(). By default load() memory maps the file and
+traverses the arrays in place, so processes loading the same file share
+it through the page cache.
+
+Binary format (little endian):
+    header   magic b'PGRF', version (u16), flags (u16), number of nodes,
+             number of adjacency entries and size of the value table (i64)
+    offsets  number of nodes + 1 int64
+    targets  number of adjacency entries int32, padded to 8 bytes
+    weights  number of adjacency entries int64 or float64, only present
+             for weighted graphs
+    values   JSON array with the node values in id order
+"""
+
+
+import json
+import mmap as _mmap
+import struct
+import sys
+from array import array
+from typing import Any, Iterable, List, Optional, Sequence, Tuple
+
+
+_INT64_MIN = -2 ** 63
+_INT64_MAX = 2 ** 63 - 1
+# largest integer every smaller integer of which a float64 holds exactly
+_FLOAT_EXACT_INT = 2 ** 53
+
+
+class FrozenGraph:
+    '''
+    Immutable snapshot of a Graph/DirectedGraph in CSR form.
+
+    Every node is identified by a dense integer id in [0, size()). The
+    neighbors of node i are targets[offsets[i]:offsets[i + 1]] and the
+    weights of those edges sit at the same positions in weights. Unweighted
+    graphs don't store a weights array at all, and weights that don't fit
+    an int64 or a float64 are kept in a list, which save() refuses.
+    '''
+    OFFSET_TYPECODE = 'q'
+    TARGET_TYPECODE = 'i'
+
+    _MAGIC = b'PGRF'
+    _VERSION = 1
+    _HEADER = struct.Struct('<4sHHqqq')
+    _DIRECTED_FLAG = 1
+    _WEIGHTED_FLAG = 2
+    _FLOAT_WEIGHTS_FLAG = 4
+    # node values that survive a round trip through the JSON value table
+    _VALUE_TYPES = (str, int, float, bool, type(None))
+
+    def __init__(self, values: List, offsets: Sequence[int],
+                 targets: Sequence[int], weights: Optional[Sequence] = None,
+                 directed: bool = False, buffer: Any = None):
+        self._values = values
+        # the value -> id table is only built once it is needed, loading a
+        # file doesn't pay for it unless nodes are looked up by value
+        self._index = None
+        self._offsets = offsets
+        self._targets = targets
+        self._weights = weights
+        self._is_directed = directed
+        # keeps the memory map the arrays point into alive
+        self._buffer = buffer
+        # (offsets, targets) of the reversed edges of a directed graph,
+        # built the first time in_neighbor_ids() is called
+        self._reverse = None
+
+    @property
+    def offsets(self) -> Sequence[int]:
+        return self._offsets
+
+    @property
+    def targets(self) -> Sequence[int]:
+        return self._targets
+
+    @property
+    def weights(self) -> Optional[Sequence]:
+        return self._weights
+
+    def _get_index(self) -> dict:
+        if self._index is None:
+            self._index = {value: i for i, value in enumerate(self._values)}
+
+        return self._index
+
+    def has_node(self, value: Any) -> bool:
+        return value in self._get_index()
+
+    def node_id(self, value: Any) -> int:
+        """Return the integer id of the node with the given value"""
+        node_id = self._get_index().get(value)
+
+        if node_id is None:
+            raise ValueError(f'Node {value} not in graph')
+
+        return node_id
+
+    def node_value(self, node_id: int) -> Any:
+        """Return the value of the node with the given integer id"""
+        return self._values[node_id]
+
+    def neighbor_ids(self, node_id: int) -> Sequence[int]:
+        """Return the ids of the neighbors of the node with the given id"""
+        return self._targets[self._offsets[node_id]:self._offsets[node_id + 1]]
+
+    def in_neighbor_ids(self, node_id: int) -> Sequence[int]:
+        """
+        Return the ids of the nodes with an edge pointing at the node with the
+        given id. For undirected graphs these are the neighbors.
+        """
+        if not self._is_directed:
+            return self.neighbor_ids(node_id)
+
+        if self._reverse is None:
+            self._reverse = self._reverse_arrays()
+
+        offsets, targets = self._reverse
+        return targets[offsets[node_id]:offsets[node_id + 1]]
+
+    def _reverse_arrays(self) -> Tuple[array, array]:
+        """Return the CSR offsets and targets of the reversed edges"""
+        num_nodes = len(self._values)
+        offsets = array(self.OFFSET_TYPECODE, bytes(8 * (num_nodes + 1)))
+        for target in self._targets:
+            offsets[target + 1] += 1
+        for i in range(num_nodes):
+            offsets[i + 1] += offsets[i]
+
+        # counting sort of the edges by their target
+        positions = array(self.OFFSET_TYPECODE, offsets)
+        targets = array(self.TARGET_TYPECODE, bytes(4 * len(self._targets)))
+        for source in range(num_nodes):
+            for i in range(self._offsets[source], self._offsets[source + 1]):
+                target = self._targets[i]
+                targets[positions[target]] = source
+                positions[target] += 1
+
+        return offsets, targets
+
+    def weighted_neighbor_ids(self, node_id: int) -> List[Tuple[int, Any]]:
+        """
+        Return (neighbor id, edge weight) tuples for the neighbors of the node
+        with the given id. Edges of unweighted graphs have a weight of 1.
+        """
+        start, end = self._offsets[node_id], self._offsets[node_id + 1]
+        if self._weights is None:
+            return [(neighbor, 1) for neighbor in self._targets[start:end]]
+
+        return list(zip(self._targets[start:end], self._weights[start:end]))
+
+    def node_ids(self) -> Iterable[int]:
+        """Return the ids of the nodes in the order they were added"""
+        return range(len(self._values))
+
+    def id_bound(self) -> int:
+        """Return an upper bound (exclusive) of the node ids"""
+        return len(self._values)
+
+    def size(self) -> int:
+        return len(self._values)
+
+    def edge_entries(self) -> int:
+        """
+        Return the number of adjacency entries. Undirected edges are stored
+        once in each direction.
+        """
+        return len(self._targets)
+
+    def is_unweighted(self) -> bool:
+        return self._weights is None
+
+    def is_directed(self) -> bool:
+        return self._is_directed
+
+    def version(self) -> int:
+        """Snapshots never change so their version is always 0"""
+        return 0
+
+    def save(self, path: str) -> None:
+        """Write the snapshot to path in the binary format described above"""
+        for value in self._values:
+            if not isinstance(value, self._VALUE_TYPES):
+                raise ValueError(f'Node value {value!r} can\'t be saved, only '
+                                 'str, int, float, bool and None values can.')
+
+        if isinstance(self._weights, list):
+            raise ValueError('Edge weights of this graph can\'t be saved, only '
+                             'weights that fit an int64 or a float64 can.')
+
+        values = json.dumps(self._values).encode('utf-8')
+        flags = self._DIRECTED_FLAG if self._is_directed else 0
+        if self._weights is not None:
+            flags |= self._WEIGHTED_FLAG
+            if _typecode(self._weights) == 'd':
+                flags |= self._FLOAT_WEIGHTS_FLAG
+
+        with open(path, mode='wb') as f:
+            f.write(self._HEADER.pack(self._MAGIC, self._VERSION, flags,
+                                      self.size(), self.edge_entries(),
+                                      len(values)))
+            f.write(_to_bytes(self._offsets, self.OFFSET_TYPECODE))
+            targets = _to_bytes(self._targets, self.TARGET_TYPECODE)
+            f.write(targets)
+            f.write(bytes(-len(targets) % 8))
+
+            if self._weights is not None:
+                f.write(_to_bytes(self._weights, _typecode(self._weights)))
+
+            f.write(values)
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> 'FrozenGraph':
+        """
+        Load a snapshot written by save(). With mmap=True the arrays are
+        read in place from a read-only memory map of the file, otherwise
+        they are copied into memory.
+        """
+        with open(path, mode='rb') as f:
+            if mmap:
+                data = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+            else:
+                data = f.read()
+
+        if len(data) < cls._HEADER.size:
+            raise ValueError(f'{path} is not a graph file.')
+
+        magic, version, flags, num_nodes, num_entries, values_size = \
+            cls._HEADER.unpack_from(data, 0)
+
+        if magic != cls._MAGIC or version != cls._VERSION:
+            raise ValueError(f'{path} is not a version {cls._VERSION} graph file.')
+
+        weight_size = 8 * num_entries if flags & cls._WEIGHTED_FLAG else 0
+        expected_size = cls._HEADER.size + 8 * (num_nodes + 1) + \
+            4 * num_entries + (4 * num_entries) % 8 + weight_size + values_size
+        if len(data) != expected_size:
+            raise ValueError(f'{path} is truncated or corrupted.')
+
+        view = memoryview(data)
+        position = cls._HEADER.size
+
+        offsets_size = 8 * (num_nodes + 1)
+        offsets = _from_bytes(view[position:position + offsets_size],
+                              cls.OFFSET_TYPECODE)
+        position += offsets_size
+
+        targets = _from_bytes(view[position:position + 4 * num_entries],
+                              cls.TARGET_TYPECODE)
+        position += 4 * num_entries
+        position += -position % 8
+
+        weights = None
+        if flags & cls._WEIGHTED_FLAG:
+            typecode = 'd' if flags & cls._FLOAT_WEIGHTS_FLAG else 'q'
+            weights = _from_bytes(view[position:position + weight_size],
+                                  typecode)
+            position += weight_size
+
+        values = json.loads(bytes(view[position:position + values_size]))
+        if len(values) != num_nodes:
+            raise ValueError(f'{path} is truncated or corrupted.')
+
+        return cls(values, offsets, targets, weights,
+                   directed=bool(flags & cls._DIRECTED_FLAG),
+                   buffer=data if mmap else None)
+
+    def __str__(self) -> str:
+        output = ''
+        for i, value in enumerate(self._values):
+            neighbors = ','.join(f'Node({self._values[j]})'
+                                 for j in self.neighbor_ids(i))
+            output += f'Node {value} is connected to [{neighbors}]\n'
+
+        return output
+
+
+def _weight_array(weights: Iterable) -> Sequence:
+    """
+    Pack edge weights into an array. Integer weights keep an integer
+    typecode so distances computed on the snapshot stay integers. Weights
+    that don't fit an int64 or a float64 exactly, like huge integers,
+    Fractions or Decimals, are kept as they are in a list.
+    """
+    weights = list(weights)
+    if all(isinstance(weight, int) and _INT64_MIN <= weight <= _INT64_MAX
+           for weight in weights):
+        return array('q', weights)
+
+    if all(isinstance(weight, float) or
+           isinstance(weight, int) and abs(weight) <= _FLOAT_EXACT_INT
+           for weight in weights):
+        return array('d', weights)
+
+    return weights
+
+
+def _typecode(values: Sequence) -> str:
+    """Return the array typecode of an array or a memoryview"""
+    return values.typecode if isinstance(values, array) else values.format
+
+
+def _to_bytes(values: Sequence, typecode: str) -> bytes:
+    """Return the little endian bytes of an array or memoryview of numbers"""
+    if sys.byteorder == 'little':
+        return bytes(values) if isinstance(values, memoryview) else values.tobytes()
+
+    swapped = array(typecode, values)
+    swapped.byteswap()
+    return swapped.tobytes()
+
+
+def _from_bytes(view: memoryview, typecode: str) -> Sequence:
+    """
+    Interpret little endian bytes as numbers. The bytes are used in place
+    on little endian machines and copied into a byteswapped array otherwise.
+    """
+    if sys.byteorder == 'little':
+        return view.cast(typecode)
+
+    values = array(typecode, view.tobytes())
+    values.byteswap()
+    return values
@@ -9,37 +9,97 @@ DirectedGraph: is an implementation of a directed graph
 Both implementations can also have weighted edges by passing a
 weight as an optional third argument to the add_edge() method
 when creating an edge between two nodes.
+
+Calling freeze() on either graph returns a read-only FrozenGraph that
+stores the adjacency lists in flat integer arrays, which is much
+cheaper to traverse than the node and edge objects. save() writes that
+snapshot to a binary file and Graph.load() maps it back into memory.
+
+Every node is also given a dense integer id when it is added. The id
+based methods (node_id, node_value, neighbor_ids, in_neighbor_ids,
+weighted_neighbor_ids, node_ids, id_bound)
+are shared with FrozenGraph and let algorithms keep their bookkeeping in
+flat lists and bytearrays indexed by id instead of hashing nodes.
+
+Connectivity queries (same_component, component_of, component_count)
+are answered by a union-find structure that is kept up to date as nodes
+and edges are added. Removing edges or nodes marks it dirty and it is
+rebuilt the next time it is queried.
 """
 
 
-from typing import Any, List
+from array import array
+from typing import Any, Iterable, List, Tuple
+
+from disjointset import DisjointSet
+from frozengraph import FrozenGraph, _weight_array
 
 
 class _Node:
-    def __init__(self, value: Any):
+    # nodes don't keep an instance __dict__, large graphs hold millions
+    __slots__ = ('value', 'id', '_edges', '_incoming')
+
+    def __init__(self, value: Any, node_id: int = -1):
         self.value = value
-        self._edges = []
+        # dense integer id assigned by the graph the node belongs to
+        self.id = node_id
+        # maps each neighbor node to the weight of the edge pointing at it,
+        # dicts keep insertion order so the edges are listed in the order
+        # they were added. Edge objects are only created on demand.
+        self._edges = {}
+        # reverse index mapping the nodes with an edge pointing at this node
+        # to the edge weight. Only DirectedGraph fills it in, undirected
+        # edges are symmetric, so it is created lazily.
+        self._incoming = None
 
     def add_edge(self, to_node: '_Node', weight: int) -> None:
-        self._edges.append(_Edge(self, to_node, weight))
+        self._edges[to_node] = weight
 
     def has_edge(self, to_node: '_Node') -> bool:
-        for edge in self._edges:
-            if edge.to_node == to_node:
-                return True
-        return False
+        return to_node in self._edges
+
+    def get_edge(self, to_node: '_Node') -> '_Edge':
+        """Return the edge pointing at to_node or None if there isn't one"""
+        if to_node not in self._edges:
+            return None
+
+        return _Edge(self, to_node, self._edges[to_node])
 
     def remove_edge(self, edge: '_Edge') -> None:
-        self._edges.remove(edge)
+        del self._edges[edge.to_node]
+
+    def add_incoming(self, from_node: '_Node', weight: int) -> None:
+        if self._incoming is None:
+            self._incoming = {}
+        self._incoming[from_node] = weight
+
+    def remove_incoming(self, from_node: '_Node') -> None:
+        if self._incoming is not None:
+            self._incoming.pop(from_node, None)
+
+    @property
+    def degree(self) -> int:
+        """Return the number of edges leaving the node"""
+        return len(self._edges)
 
     @property
     def edges(self) -> List['_Edge']:
-        return self._edges
+        return [_Edge(self, to_node, weight)
+                for to_node, weight in self._edges.items()]
+
+    @property
+    def incoming_edges(self) -> List['_Edge']:
+        """Return a list with the edges of a directed graph ending at the node"""
+        if self._incoming is None:
+            return []
+
+        return [_Edge(from_node, self, weight)
+                for from_node, weight in self._incoming.items()]
 
     @property
     def neighbors(self) -> List['_Node']:
         """Return a list with the neighbors of the node"""
-        return [edge.to_node for edge in self._edges]
+        return list(self._edges)
 
     def __str__(self) -> str:
         return f'Node({self.value})'
@@ -49,11 +109,26 @@ class _Node:
 
 
 class _Edge:
+    """
+    View of an edge between two nodes. Nodes store their edges in their
+    adjacency dicts so edges compare equal by their endpoints.
+    """
+    __slots__ = ('from_node', 'to_node', 'weight')
+
     def __init__(self, from_node: _Node, to_node: _Node, weight: int):
         self.from_node = from_node
         self.to_node = to_node
         self.weight = weight
 
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, _Edge):
+            return NotImplemented
+
+        return self.from_node is other.from_node and self.to_node is other.to_node
+
+    def __hash__(self) -> int:
+        return hash((self.from_node, self.to_node))
+
     def __str__(self) -> str:
         return f'Node({self.from_node.value}) -> Node({self.to_node.value})'
 
@@ -67,33 +142,81 @@ class Graph:
     Nodes must be unique and edges have a default weight of 1.
     '''
     _DEFAULT_WEIGHT = 1
+    # size hint in bytes of the chunks read by from_edge_list()
+    _CHUNK_SIZE = 1 << 20
 
     def __init__(self, unweighted=True):
         self._nodes = {}
+        # reverse table from node id to node, ids of removed nodes are kept
+        # in _free_ids and handed out again so the ids stay dense
+        self._id_nodes = []
+        self._free_ids = []
         self._is_unweighted = unweighted
         self._nodes_count = 0
         self._edges_count = 0
+        # bumped on every change to the graph so cached query results can
+        # tell when they are stale
+        self._version = 0
+        # union-find over node ids, only maintained once components are
+        # queried or track_components() is called
+        self._components = None
+        self._components_dirty = False
+
+    def _new_node(self, value: Any) -> _Node:
+        """Create a node for value, give it an id and add it to the graph"""
+        if len(self._free_ids) > 0:
+            node = _Node(value, self._free_ids.pop())
+            self._id_nodes[node.id] = node
+        else:
+            node = _Node(value, len(self._id_nodes))
+            self._id_nodes.append(node)
+
+        self._nodes[value] = node
+        self._version += 1
+
+        if self._components is not None and not self._components_dirty:
+            self._components.add(node.id)
+
+        return node
+
+    def _release_node(self, node: _Node) -> None:
+        """Drop a node whose edges were already removed from the graph"""
+        self._nodes.pop(node.value)
+        self._id_nodes[node.id] = None
+        self._free_ids.append(node.id)
+        self._nodes_count -= 1
+        self._version += 1
+        self._components_dirty = True
 
     def add_node(self, value: Any) -> None:
         if value not in self._nodes:
-            self._nodes[value] = _Node(value)
+            self._new_node(value)
             self._nodes_count += 1
 
+    def add_nodes_from(self, values: Iterable[Any]) -> None:
+        """Add every value in values as a node, skipping existing ones"""
+        nodes = self._nodes
+        for value in values:
+            if value not in nodes:
+                self._new_node(value)
+
+        self._nodes_count = len(nodes)
+
     def remove_node(self, value: Any) -> None:
         node_to_remove = self._nodes.get(value)
 
         if node_to_remove == None:
             raise ValueError(f'Node {value} not in graph.')
 
-        for node in self._nodes.values():
-            for edge in node.edges:
-                if edge.to_node == node_to_remove:
-                    node.remove_edge(edge)
-                    self._edges_count -= 1
-                    break
+        # edges are symmetric so only the neighbors point back at the node
+        neighbors = node_to_remove.neighbors
+        for neighbor in neighbors:
+            back_edge = neighbor.get_edge(node_to_remove)
+            if back_edge is not None:
+                neighbor.remove_edge(back_edge)
 
-        self._nodes.pop(value)
-        self._nodes_count -= 1
+        self._edges_count -= len(neighbors)
+        self._release_node(node_to_remove)
 
     def has_node(self, value: Any) -> bool:
         return value in self._nodes
@@ -106,25 +229,157 @@ class Graph:
 
         return node
 
+    def node_id(self, value: Any) -> int:
+        """Return the integer id of the node with the given value"""
+        return self.get_node(value).id
+
+    def node_value(self, node_id: int) -> Any:
+        """Return the value of the node with the given integer id"""
+        return self._id_nodes[node_id].value
+
+    def neighbor_ids(self, node_id: int) -> List[int]:
+        """Return the ids of the neighbors of the node with the given id"""
+        return [neighbor.id for neighbor in self._id_nodes[node_id]._edges]
+
+    def in_neighbor_ids(self, node_id: int) -> List[int]:
+        """
+        Return the ids of the nodes with an edge pointing at the node with the
+        given id. Edges are symmetric so these are the neighbors.
+        """
+        return self.neighbor_ids(node_id)
+
+    def weighted_neighbor_ids(self, node_id: int) -> List[Tuple[int, Any]]:
+        """
+        Return (neighbor id, edge weight) tuples for the neighbors of the node
+        with the given id. Edges of unweighted graphs have a weight of 1
+        whatever weight was passed to add_edge(), like in a snapshot.
+        """
+        if self._is_unweighted:
+            return [(neighbor.id, self._DEFAULT_WEIGHT) for neighbor
+                    in self._id_nodes[node_id]._edges]
+
+        return [(neighbor.id, weight) for neighbor, weight
+                in self._id_nodes[node_id]._edges.items()]
+
+    def node_ids(self) -> Iterable[int]:
+        """Return the ids of the nodes in the order they were added"""
+        return [node.id for node in self._nodes.values()]
+
+    def id_bound(self) -> int:
+        """
+        Return an upper bound (exclusive) of the node ids in use, the size of
+        a list or bytearray indexed by node id.
+        """
+        return len(self._id_nodes)
+
     def add_edge(self, from_value: Any, to_value: Any, weight=_DEFAULT_WEIGHT) -> None:
         from_node = self._nodes.get(from_value)
         to_node = self._nodes.get(to_value)
-        added_edge = False
 
         if from_node == None or to_node == None:
             missing_node = to_value if to_node is None else from_value
             raise ValueError(f'Node {missing_node} is not in graph.')
 
+        added_edge = self._link(from_node, to_node, weight)
+        self._edges_count += added_edge
+        self._version += added_edge
+
+        if added_edge and self._components is not None and not self._components_dirty:
+            self._components.union(from_node.id, to_node.id)
+
+    def add_edges_from(self, edges: Iterable[Tuple]) -> None:
+        """
+        Add every (from_value, to_value) or (from_value, to_value, weight)
+        tuple in edges. Nodes that aren't in the graph yet are created.
+        """
+        nodes = self._nodes
+        added_edges = 0
+
+        for edge in edges:
+            from_value, to_value = edge[0], edge[1]
+            weight = edge[2] if len(edge) > 2 else self._DEFAULT_WEIGHT
+
+            from_node = nodes.get(from_value)
+            if from_node is None:
+                from_node = self._new_node(from_value)
+
+            to_node = nodes.get(to_value)
+            if to_node is None:
+                to_node = self._new_node(to_value)
+
+            if self._link(from_node, to_node, weight):
+                added_edges += 1
+                if self._components is not None and not self._components_dirty:
+                    self._components.union(from_node.id, to_node.id)
+
+        self._nodes_count = len(nodes)
+        self._edges_count += added_edges
+        self._version += added_edges
+
+    def _link(self, from_node: _Node, to_node: _Node, weight: int) -> int:
+        """
+        Connect two nodes already in the graph. Return 1 if a new edge was
+        created and 0 if the nodes were already connected.
+        """
+        added_edge = 0
+
         # undirected graph need edges pointing in both directions
-        if not from_node.has_edge(to_node):
-            from_node.add_edge(to_node, weight)
-            added_edge = True
+        if to_node not in from_node._edges:
+            from_node._edges[to_node] = weight
+            added_edge = 1
+
+        if from_node not in to_node._edges:
+            to_node._edges[from_node] = weight
+            added_edge = 1
+
+        return added_edge
+
+    @classmethod
+    def from_edge_list(cls, path: str, directed: bool = False,
+                       weighted: bool = False, value_type=str,
+                       chunk_size: int = _CHUNK_SIZE) -> 'Graph':
+        """
+        Build a graph from a text file with one edge per line. The fields of
+        a line are separated by whitespace or commas: the two node values
+        followed by the weight of the edge when weighted is True. Blank
+        lines and lines starting with '#' are skipped.
+
+        The file is read in chunks of about chunk_size bytes and node values
+        are converted with value_type. Return a DirectedGraph when directed
+        is True.
+        """
+        graph_class = DirectedGraph if directed else cls
+        graph = graph_class(unweighted=not weighted)
+        num_fields = 3 if weighted else 2
+        line_number = 0
+
+        with open(path, mode='r') as f:
+            while True:
+                lines = f.readlines(chunk_size)
+                if len(lines) == 0:
+                    break
 
-        if not to_node.has_edge(from_node):
-            to_node.add_edge(from_node, weight)
-            added_edge = True
+                edges = []
+                for line in lines:
+                    line_number += 1
+                    fields = line.replace(',', ' ').split()
 
-        self._edges_count += 1 if added_edge else 0
+                    if len(fields) == 0 or fields[0].startswith('#'):
+                        continue
+
+                    if len(fields) != num_fields:
+                        raise ValueError(
+                            f'Line {line_number} of {path} is not a valid edge.')
+
+                    if weighted:
+                        edges.append((value_type(fields[0]), value_type(fields[1]),
+                                      _parse_weight(fields[2])))
+                    else:
+                        edges.append((value_type(fields[0]), value_type(fields[1])))
+
+                graph.add_edges_from(edges)
+
+        return graph
 
     def remove_edge(self, from_value: Any, to_value: Any) -> None:
         from_node = self._nodes.get(from_value)
@@ -134,11 +389,18 @@ class Graph:
             missing_node = to_value if to_node is None else from_value
             raise ValueError(f'Node {missing_node} is not in graph.')
 
-        for edge in from_node.edges:
-            if edge.to_node == to_node:
-                from_node.remove_edge(edge)
-                self._edges_count -= 1
-                break
+        edge = from_node.get_edge(to_node)
+        if edge is None:
+            return
+
+        # remove both directions of the undirected edge
+        from_node.remove_edge(edge)
+        back_edge = to_node.get_edge(from_node)
+        if back_edge is not None:
+            to_node.remove_edge(back_edge)
+        self._edges_count -= 1
+        self._version += 1
+        self._components_dirty = True
 
     def has_edge(self, from_value: Any, to_value: Any) -> bool:
         from_node = self._nodes.get(from_value)
@@ -149,6 +411,49 @@ class Graph:
 
         return from_node.has_edge(to_node)
 
+    def track_components(self) -> None:
+        """
+        Start maintaining the connected components of the graph in a
+        union-find structure. Every added edge merges two components in near
+        constant time. For a DirectedGraph these are the weakly connected
+        components.
+        """
+        if self._components is None or self._components_dirty:
+            components = DisjointSet()
+            for node in self._nodes.values():
+                components.add(node.id)
+
+            for node in self._nodes.values():
+                for neighbor in node._edges:
+                    components.union(node.id, neighbor.id)
+
+            self._components = components
+            self._components_dirty = False
+
+    def same_component(self, first_value: Any, second_value: Any) -> bool:
+        """Return True if there is a path between the two nodes"""
+        first_id = self.node_id(first_value)
+        second_id = self.node_id(second_value)
+        self.track_components()
+
+        return self._components.connected(first_id, second_id)
+
+    def component_of(self, value: Any) -> Any:
+        """
+        Return the value of the node representing the component the node with
+        value is in. Nodes in the same component share a representative as
+        long as the graph doesn't change.
+        """
+        node_id = self.node_id(value)
+        self.track_components()
+
+        return self.node_value(self._components.find(node_id))
+
+    def component_count(self) -> int:
+        """Return the number of connected components in the graph"""
+        self.track_components()
+        return self._components.count
+
     def size(self) -> int:
         return len(self._nodes)
 
@@ -158,6 +463,47 @@ class Graph:
     def is_unweighted(self) -> bool:
         return self._is_unweighted
 
+    def version(self) -> int:
+        """Return a counter that changes every time the graph is modified"""
+        return self._version
+
+    def is_directed(self) -> bool:
+        return False
+
+    def freeze(self) -> FrozenGraph:
+        """
+        Return a read-only CSR snapshot of the graph. Node ids follow the
+        order in which the nodes were added. Later changes to the graph
+        are not reflected in the snapshot.
+        """
+        ids = {node: i for i, node in enumerate(self._nodes.values())}
+        offsets = array(FrozenGraph.OFFSET_TYPECODE, [0])
+        targets = array(FrozenGraph.TARGET_TYPECODE)
+        weights = []
+
+        for node in self._nodes.values():
+            for neighbor, weight in node._edges.items():
+                targets.append(ids[neighbor])
+                weights.append(weight)
+            offsets.append(len(targets))
+
+        return FrozenGraph(list(self._nodes), offsets, targets,
+                           None if self._is_unweighted else _weight_array(weights),
+                           directed=self.is_directed())
+
+    def save(self, path: str) -> None:
+        """Write a binary snapshot of the graph to path (see FrozenGraph)"""
+        self.freeze().save(path)
+
+    @staticmethod
+    def load(path: str, mmap: bool = True) -> FrozenGraph:
+        """
+        Load a graph written by save(). The result is a read-only
+        FrozenGraph, with mmap=True its arrays are read in place from the
+        memory mapped file instead of being copied.
+        """
+        return FrozenGraph.load(path, mmap=mmap)
+
     def __str__(self) -> str:
         output = ''
         for node in self._nodes.values():
@@ -187,12 +533,65 @@ class DirectedGraph(Graph):
     def __init__(self, unweighted=True):
         super().__init__(unweighted=unweighted)
 
-    def add_edge(self, from_value: Any, to_value: Any, weight=_DEFAULT_WEIGHT) -> None:
+    def _link(self, from_node: _Node, to_node: _Node, weight: int) -> int:
+        if from_node.has_edge(to_node):
+            return 0
+
+        from_node.add_edge(to_node, weight)
+        to_node.add_incoming(from_node, weight)
+        return 1
+
+    def remove_node(self, value: Any) -> None:
+        node_to_remove = self._nodes.get(value)
+
+        if node_to_remove == None:
+            raise ValueError(f'Node {value} not in graph.')
+
+        out_edges = node_to_remove.edges
+        in_edges = node_to_remove.incoming_edges
+        # a self loop is both an outgoing and an incoming edge
+        self_loop = 1 if node_to_remove.has_edge(node_to_remove) else 0
+
+        for edge in out_edges:
+            edge.to_node.remove_incoming(node_to_remove)
+
+        for edge in in_edges:
+            edge.from_node.remove_edge(edge)
+
+        self._edges_count -= len(out_edges) + len(in_edges) - self_loop
+        self._release_node(node_to_remove)
+
+    def remove_edge(self, from_value: Any, to_value: Any) -> None:
         from_node = self._nodes.get(from_value)
         to_node = self._nodes.get(to_value)
 
         if from_node == None or to_node == None:
-            raise ValueError
+            missing_node = to_value if to_node is None else from_value
+            raise ValueError(f'Node {missing_node} is not in graph.')
 
-        if not from_node.has_edge(to_node):
-            from_node.add_edge(to_node, weight)
+        edge = from_node.get_edge(to_node)
+        if edge is not None:
+            from_node.remove_edge(edge)
+            to_node.remove_incoming(from_node)
+            self._edges_count -= 1
+            self._version += 1
+            self._components_dirty = True
+
+    def in_neighbor_ids(self, node_id: int) -> List[int]:
+        """
+        Return the ids of the nodes with an edge pointing at the node with the
+        given id
+        """
+        incoming = self._id_nodes[node_id]._incoming
+        return [] if incoming is None else [node.id for node in incoming]
+
+    def is_directed(self) -> bool:
+        return True
+
+
+def _parse_weight(token: str):
+    """Parse an edge weight read from a file as an int, or a float"""
+    try:
+        return int(token)
+    except ValueError:
+        return float(token)
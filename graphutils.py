@@ -1,190 +1,1086 @@
-from typing import Dict, List
-from graph import Graph, DirectedGraph, _Node
-from collections import deque
+import math
+import os
+import tempfile
+import weakref
+from array import array
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from heapq import heappop, heappush
+from typing import (Any, Callable, Dict, Iterable, Iterator, List, NamedTuple,
+                    Optional, Tuple, Union)
+from graph import Graph, DirectedGraph
+from disjointset import DisjointSet
+from frozengraph import FrozenGraph
+
+# NumPy is only needed by bfs_levels()
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class PathResult(NamedTuple):
+    """
+    Result of a weighted shortest path search.
+
+    path: values of the nodes on the path, empty if there is no path
+    distance: total weight of the path, math.inf if there is no path
+    expanded: number of nodes the search settled
+    """
+    path: List
+    distance: Any
+    expanded: int
+
+
+class CycleError(ValueError):
+    """
+    Raised when a topological order is requested for a graph with a cycle.
+    The cycle attribute lists the values of the nodes on one of the cycles.
+    """
+    def __init__(self, cycle: List):
+        super().__init__(f'Graph contains a cycle: {cycle}')
+        self.cycle = cycle
+
+
+class CacheInfo(NamedTuple):
+    """Statistics of the shortest path cache, like functools.lru_cache"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+class _PrevTableCache:
+    """
+    Bounded LRU cache of BFS parent tables keyed by (graph, source id).
+
+    Entries remember the version of the graph they were computed on and
+    are dropped when the graph has changed since. Graphs are only held
+    through weak references so the cache doesn't keep them alive.
+    """
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError('The cache must hold at least one entry.')
+
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, graph: Union[Graph, FrozenGraph], source: int) -> Optional[list]:
+        key = (id(graph), source)
+        entry = self._entries.get(key)
+
+        if entry is not None:
+            graph_ref, version, prev_table = entry
+            if graph_ref() is graph and version == graph.version():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return prev_table
+
+            del self._entries[key]
+
+        self.misses += 1
+        return None
+
+    def put(self, graph: Union[Graph, FrozenGraph], source: int,
+            prev_table: list) -> None:
+        key = (id(graph), source)
+        self._entries[key] = (weakref.ref(graph), graph.version(), prev_table)
+        self._entries.move_to_end(key)
+
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+    def info(self) -> CacheInfo:
+        return CacheInfo(self.hits, self.misses, self.maxsize, len(self._entries))
+
+
+# FrozenGraph loaded by each worker process of all_pairs_unweighted()
+_worker_graph = None
+
+
+def _init_distance_worker(path: str) -> None:
+    """Map the graph snapshot shared by the parent process"""
+    global _worker_graph
+    _worker_graph = FrozenGraph.load(path, mmap=True)
+
+
+def _distances_chunk(sources: List[int]) -> List[Tuple[int, bytes]]:
+    """Return (source id, packed hop distances) for every source id"""
+    return [(source, GraphUtils._bfs_distances(_worker_graph, source).tobytes())
+            for source in sources]
 
 
 class GraphUtils:
+    """
+    Graph algorithms that work on Graph, DirectedGraph and FrozenGraph
+    objects. The algorithms use the integer node ids of the graphs so
+    visited markers are bytearrays and parent tables are lists indexed by
+    node id. Node values are only looked up to build the results.
+    """
+    # opt-in cache of BFS parent tables used by unweighted_shortest_path
+    _path_cache = None
+
+    @classmethod
+    def enable_path_cache(cls, maxsize: int = 128) -> None:
+        """
+        Cache the BFS parent tables computed by unweighted_shortest_path for
+        up to maxsize (graph, start) pairs. Repeated queries from the same
+        start only reconstruct the path. Entries are invalidated when the
+        graph is modified. Enabling the cache again empties it.
+        """
+        cls._path_cache = _PrevTableCache(maxsize)
+
+    @classmethod
+    def disable_path_cache(cls) -> None:
+        cls._path_cache = None
+
+    @classmethod
+    def path_cache_info(cls) -> Optional[CacheInfo]:
+        """Return the hit/miss statistics of the cache, None if disabled"""
+        return None if cls._path_cache is None else cls._path_cache.info()
+
     @classmethod
-    def depth_first_traversal_iterative(cls, graph: Graph, node: str) -> List:
+    def depth_first_traversal_iterative(cls, graph: Union[Graph, FrozenGraph],
+                                        node: str) -> List:
         """
         Using a stack for this iterative implementation of DFS.
 
         Returns a list with a DFS traversal of the graph starting at node
         """
-        stack = []
-        visited = set()
-        path = []
-
         if not graph.has_node(node):
             raise ValueError(f'Graph doesn\'t contain node {node}')
 
-        stack.append(graph.get_node(node))
+        visited = bytearray(graph.id_bound())
+        stack = [graph.node_id(node)]
+        path = []
 
         while len(stack) > 0:
             current = stack.pop()
 
-            if current in visited:
+            if visited[current]:
                 continue
 
-            path.append(current.value)
-            visited.add(current)
+            path.append(graph.node_value(current))
+            visited[current] = 1
 
-            for neighbor in current.neighbors:
-                if neighbor not in visited:
+            for neighbor in graph.neighbor_ids(current):
+                if not visited[neighbor]:
                     stack.append(neighbor)
 
         return path
 
     @classmethod
-    def depth_first_traversal_recursive(cls,  graph: Graph, node: str) -> List:
-        """Returns a list with a DFS traversal of the graph starting at node"""
+    def depth_first_traversal_recursive(cls, graph: Union[Graph, FrozenGraph],
+                                        node: str) -> List:
+        """
+        Returns a list with a DFS traversal of the graph starting at node
+
+        The nodes are listed in the order a recursive DFS visits them, but
+        an explicit stack is used so deep graphs don't hit the recursion
+        limit.
+        """
         if not graph.has_node(node):
             raise ValueError(f'Graph doesn\'t contain node {node}')
 
-        path = []
-        cls._dfs_helper(graph.get_node(node), set(), path)
-
-        return path
+        return list(cls._iter_preorder(graph, graph.node_id(node),
+                                       bytearray(graph.id_bound()),
+                                       graph.neighbor_ids))
 
     @classmethod
-    def _dfs_helper(cls, node: _Node, visited: set, path: list) -> None:
-        """Recursive helper function for DFS method"""
-        path.append(node.value)
-        visited.add(node)
+    def find_components(cls,  graph: Union[Graph, FrozenGraph]) -> List[List]:
+        """
+        Return a list of lists were each of these list represents a connected component.
 
-        for neighbor in node.neighbors:
-            if neighbor not in visited:
-                cls._dfs_helper(neighbor, visited, path)
+        For directed graphs these are the weakly connected components, the
+        direction of the edges is ignored. See strongly_connected_components.
+        """
+        return list(cls.iter_components(graph))
 
     @classmethod
-    def find_components(cls,  graph: Graph) -> List[List]:
+    def iter_components(cls, graph: Union[Graph, FrozenGraph]) -> Iterator[List]:
         """
-        Return a list of lists were each of these list represents a connected component.
+        Generator version of find_components, yields the connected components
+        one at a time as they are found.
         """
+        visited = bytearray(graph.id_bound())
+        neighbor_ids = cls._component_neighbor_ids(graph)
 
-        # This list will store tuples of node and the id of the component
-        # that that node in the graph belongs to.
-        nodes_ids = []
-        num_components = 0
-        visited = set()
+        for node in graph.node_ids():
+            if not visited[node]:
+                yield list(cls._iter_preorder(graph, node, visited, neighbor_ids))
 
-        for node in graph:
-            if not node in visited:
-                cls._dfs_components(num_components, node, visited, nodes_ids)
-                num_components += 1
+    @classmethod
+    def _component_neighbor_ids(cls, graph: Union[Graph, FrozenGraph]) -> Callable:
+        """
+        Return a function listing the ids of the nodes connected to a node
+        by an edge in either direction
+        """
+        if not graph.is_directed():
+            return graph.neighbor_ids
 
-        components = [[] for i in range(num_components)]
-        for node, component_id in nodes_ids:
-            components[component_id].append(node.value)
+        def neighbor_ids(node: int) -> List[int]:
+            return list(graph.neighbor_ids(node)) + list(graph.in_neighbor_ids(node))
 
-        return components
+        return neighbor_ids
 
     @classmethod
-    def _dfs_components(cls, component_id: int, node: _Node, visited: set,
-                        ids_list: list) -> None:
+    def _iter_preorder(cls, graph: Union[Graph, FrozenGraph], root: int,
+                       visited: bytearray, neighbor_ids: Callable) -> Iterator:
         """
-        Method finds the connected components in a graphs by doing a dfs
-        of every node. It labels all the connected nodes with the same id.
+        Yield the values of the unvisited nodes reachable from root in the
+        preorder of a recursive DFS starting at root, marking them visited.
 
-        Populates the ids_list this list stores tuples of node and the id of the component that that node in the graph belongs to.
+        Nodes are marked when popped and their neighbors are pushed in
+        reverse, so the first unvisited neighbor of the most recently
+        visited node is always on top, which is the node the recursion
+        would descend into next. The stack holds plain ids, so memory stays
+        linear in the number of edges however deep the search goes.
         """
-        ids_list.append((node, component_id))
-        visited.add(node)
+        stack = [root]
+
+        while len(stack) > 0:
+            current = stack.pop()
 
-        for neighbor in node.neighbors:
-            if neighbor not in visited:
-                cls._dfs_components(component_id, neighbor, visited, ids_list)
+            if visited[current]:
+                continue
+
+            visited[current] = 1
+            yield graph.node_value(current)
+
+            for neighbor in reversed(neighbor_ids(current)):
+                if not visited[neighbor]:
+                    stack.append(neighbor)
 
     @classmethod
-    def breadth_first_search(cls, graph: Graph, node: str,
+    def breadth_first_search(cls, graph: Union[Graph, FrozenGraph], node: str,
                              returnPrev: bool = False) -> List:
         """Returns a list indicating the BFS path rooted at the node"""
         if not graph.has_node(node):
             raise ValueError('Node not in graph!')
 
-        start_node = graph.get_node(node)
+        _, order = cls._get_prev_table(graph, graph.node_id(node))
 
-        visited = set()
-        visited.add(start_node)
+        return [graph.node_value(i) for i in order]
 
-        path = [start_node.value]
+    @classmethod
+    def iter_bfs(cls, graph: Union[Graph, FrozenGraph], start: Any,
+                 max_depth: int = None) -> Iterator[Tuple[Any, int, Any]]:
+        """
+        Lazily yield (value, depth, parent value) tuples in BFS order starting
+        at start, whose parent is None. Nodes further than max_depth edges
+        from start aren't visited. The traversal only advances as the
+        caller consumes it, so it can be stopped at any point.
+        """
+        if not graph.has_node(start):
+            raise ValueError('Node not in graph!')
+
+        start_id = graph.node_id(start)
+        visited = bytearray(graph.id_bound())
+        visited[start_id] = 1
+        queue = deque([(start_id, 0)])
+
+        yield start, 0, None
 
-        queue = deque([start_node])
         while len(queue) > 0:
-            current = queue.popleft()
+            current, depth = queue.popleft()
 
-            for neighbor in current.neighbors:
-                if not neighbor in visited:
-                    queue.append(neighbor)
-                    path.append(neighbor.value)
-                    visited.add(neighbor)
+            if max_depth is not None and depth >= max_depth:
+                continue
 
-        return path
+            parent = graph.node_value(current)
+            for neighbor in graph.neighbor_ids(current):
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    queue.append((neighbor, depth + 1))
+                    yield graph.node_value(neighbor), depth + 1, parent
+
+    @classmethod
+    def iter_dfs(cls, graph: Union[Graph, FrozenGraph], start: Any,
+                 max_depth: int = None) -> Iterator[Tuple[Any, int, Any]]:
+        """
+        Lazily yield (value, depth, parent value) tuples in the preorder of a
+        recursive DFS starting at start, whose parent is None. Depth is the
+        depth in the DFS tree and nodes deeper than max_depth aren't visited.
+        """
+        if not graph.has_node(start):
+            raise ValueError(f'Graph doesn\'t contain node {start}')
+
+        visited = bytearray(graph.id_bound())
+        # same pop-time marking as _iter_preorder, entries are
+        # (node id, depth, parent id)
+        stack = [(graph.node_id(start), 0, -1)]
+
+        while len(stack) > 0:
+            current, depth, parent = stack.pop()
+
+            if visited[current]:
+                continue
+
+            visited[current] = 1
+            yield (graph.node_value(current), depth,
+                   None if parent == -1 else graph.node_value(parent))
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            for neighbor in reversed(graph.neighbor_ids(current)):
+                if not visited[neighbor]:
+                    stack.append((neighbor, depth + 1, current))
 
     @ classmethod
-    def unweighted_shortest_path(cls, graph: Graph, start: str, end: str) -> List:
+    def unweighted_shortest_path(cls, graph: Union[Graph, FrozenGraph],
+                                 start: str, end: str,
+                                 bidirectional: bool = False) -> List:
         """
         Return a list with the shortest path from start node to end node
 
+        The BFS stops as soon as end is reached, unless the path cache is
+        enabled (see enable_path_cache). With bidirectional=True
+        a BFS is also run backwards from end and the path is found where the
+        two searches meet, which only explores the neighborhoods of start
+        and end on low diameter graphs. Both return a shortest path, but
+        when there are several of them they may return different ones.
+
         Note: Function only works for unweighted graphs.
         """
         if not graph.is_unweighted():
-            raise ValueError('Function only works for unweighted graphs.')
+            raise ValueError('Function only works for unweighted graphs, '
+                             'use dijkstra_shortest_path for weighted graphs.')
 
         if not (graph.has_node(start) and graph.has_node(end)):
             raise ValueError(f'Node {start} or node {end} not in graph.')
 
-        start_node = graph.get_node(start)
-        end_node = graph.get_node(end)
+        start_id = graph.node_id(start)
+        end_id = graph.node_id(end)
+
+        if bidirectional:
+            return cls._bidirectional_path(graph, start_id, end_id)
 
-        prev_table = cls._get_prev_table(graph, start_node)
+        if cls._path_cache is not None:
+            prev_table = cls._path_cache.get(graph, start_id)
+            if prev_table is None:
+                # cached tables must cover every node reachable from start
+                prev_table, _ = cls._get_prev_table(graph, start_id)
+                cls._path_cache.put(graph, start_id, prev_table)
+        else:
+            prev_table, _ = cls._get_prev_table(graph, start_id, end_id)
 
-        return cls._reconstruct_path(start_node, end_node, prev_table)
+        return cls._reconstruct_path(graph, start_id, end_id, prev_table)
 
     @ classmethod
-    def _get_prev_table(cls, graph: Graph, start_node: _Node) -> Dict:
+    def _get_prev_table(cls, graph: Union[Graph, FrozenGraph],
+                        start: int, stop: int = -1) -> tuple:
         """
-        Return a dictionary where key is a graph Node object value and value
-        is the parent value of that node in a BFS traversal starting
-        at the start_node
+        BFS starting at the node with the start id. The search ends early
+        once the node with the stop id is reached.
+
+        Return a tuple with a list where prev_table[id] is the parent id of
+        that node in the traversal (-1 for the start node and for nodes that
+        weren't reached) and a list with the ids in the order they were
+        visited.
         """
-        queue = deque([start_node])
+        prev_table = [-1] * graph.id_bound()
+        visited = bytearray(graph.id_bound())
+        visited[start] = 1
+
+        # the visiting order doubles as the BFS queue
+        order = [start]
+        head = 0
+        while head < len(order):
+            current = order[head]
+            head += 1
+
+            for neighbor in graph.neighbor_ids(current):
+                if not visited[neighbor]:
+                    visited[neighbor] = 1
+                    prev_table[neighbor] = current
+                    order.append(neighbor)
 
-        visited = set()
-        visited.add(start_node)
+                    if neighbor == stop:
+                        return prev_table, order
 
-        # set the parent of the start node to None
-        prev_table = {start_node.value: None}
+        return prev_table, order
+
+    @ classmethod
+    def _bfs_distances(cls, graph: Union[Graph, FrozenGraph], start: int) -> array:
+        """
+        Return an int32 array where distances[id] is the number of edges on
+        the shortest path from start to that node, -1 if it isn't reachable
+        """
+        distances = array('i', [-1]) * graph.id_bound()
+        distances[start] = 0
+        queue = deque([start])
 
         while len(queue) > 0:
             current = queue.popleft()
+            distance = distances[current] + 1
 
-            for neighbor in current.neighbors:
-                if neighbor not in visited:
+            for neighbor in graph.neighbor_ids(current):
+                if distances[neighbor] == -1:
+                    distances[neighbor] = distance
                     queue.append(neighbor)
-                    visited.add(neighbor)
-                    prev_table[neighbor.value] = current.value
 
-        return prev_table
+        return distances
+
+    @classmethod
+    def multi_source_distances(cls, graph: Union[Graph, FrozenGraph],
+                               sources: Iterable, workers: int = None) -> Dict:
+        """
+        Return a dictionary mapping every source value to a dictionary with
+        the hop distance from that source to every node it can reach. The
+        BFS runs are spread over workers processes (see all_pairs_unweighted).
+        """
+        return dict(cls.all_pairs_unweighted(graph, workers=workers,
+                                             sources=sources))
+
+    @classmethod
+    def all_pairs_unweighted(cls, graph: Union[Graph, FrozenGraph],
+                             workers: int = None, sources: Iterable = None,
+                             chunk_size: int = 64) -> Iterator[Tuple[Any, Dict]]:
+        """
+        Yield (source value, {value: hop distance}) tuples for every source,
+        every node of the graph by default, in the order of sources.
+
+        The graph is written once to a temporary binary snapshot that every
+        worker process memory maps read-only, so it isn't pickled per task.
+        Sources are handed out chunk_size at a time and only a few chunks are
+        in flight at once, so results stream out as they are consumed.
+        workers defaults to the number of CPUs, workers=1 runs in process.
+        """
+        frozen = graph if isinstance(graph, FrozenGraph) else graph.freeze()
+        if sources is None:
+            source_ids = list(range(frozen.size()))
+        else:
+            source_ids = [frozen.node_id(source) for source in sources]
+
+        workers = workers or os.cpu_count() or 1
+        if workers == 1:
+            for source in source_ids:
+                distances = cls._bfs_distances(frozen, source)
+                yield frozen.node_value(source), cls._distance_dict(frozen, distances)
+            return
+
+        chunks = [source_ids[i:i + chunk_size]
+                  for i in range(0, len(source_ids), chunk_size)]
+
+        with tempfile.TemporaryDirectory() as directory:
+            # workers only need the structure, so the ids stand in for the
+            # node values and any value type can be shared
+            path = os.path.join(directory, 'graph.bin')
+            FrozenGraph(list(range(frozen.size())), frozen.offsets,
+                        frozen.targets, directed=frozen.is_directed()).save(path)
+
+            executor = ProcessPoolExecutor(workers, initializer=_init_distance_worker,
+                                           initargs=(path,))
+            try:
+                pending = deque()
+                next_chunk = 0
+                while next_chunk < len(chunks) or len(pending) > 0:
+                    while next_chunk < len(chunks) and len(pending) < 2 * workers:
+                        pending.append(executor.submit(_distances_chunk,
+                                                       chunks[next_chunk]))
+                        next_chunk += 1
+
+                    for source, packed in pending.popleft().result():
+                        distances = array('i')
+                        distances.frombytes(packed)
+                        yield (frozen.node_value(source),
+                               cls._distance_dict(frozen, distances))
+            finally:
+                executor.shutdown(wait=True, cancel_futures=True)
+
+    @classmethod
+    def _distance_dict(cls, graph: FrozenGraph, distances: array) -> Dict:
+        """Map the values of the reached nodes to their distance"""
+        return {graph.node_value(node): distance
+                for node, distance in enumerate(distances) if distance != -1}
+
+    @classmethod
+    def bfs_levels(cls, graph: FrozenGraph, start: Any,
+                   direction_optimizing: bool = True):
+        """
+        Return a NumPy int32 array where levels[id] is the number of edges on
+        the shortest path from start to the node with that FrozenGraph id,
+        -1 if the node isn't reachable. Requires NumPy.
+
+        The BFS is level synchronous and every level is expanded with array
+        operations over the CSR arrays of the snapshot. Top-down steps
+        gather the edges leaving the frontier. Bottom-up steps gather the
+        edges entering the unvisited nodes and keep the ones coming from the
+        frontier. With direction_optimizing=True each level uses whichever
+        of the two looks at fewer edges, which on low diameter graphs skips
+        most of the work on the few huge middle levels. Every level has a
+        fixed NumPy overhead, so on long high diameter graphs (paths, grids)
+        the plain BFS of breadth_first_search is faster.
+        """
+        if np is None:
+            raise ImportError('bfs_levels requires NumPy to be installed.')
+
+        if not isinstance(graph, FrozenGraph):
+            raise ValueError('bfs_levels works on FrozenGraph snapshots, '
+                             'call freeze() on the graph first.')
+
+        offsets = np.frombuffer(graph.offsets, dtype=np.int64)
+        targets = np.frombuffer(graph.targets, dtype=np.int32)
+        out_degree = np.diff(offsets)
+
+        if graph.is_directed():
+            in_degree = np.bincount(targets, minlength=graph.size())
+            in_offsets = np.zeros(graph.size() + 1, dtype=np.int64)
+            np.cumsum(in_degree, out=in_offsets[1:])
+            sources = np.repeat(np.arange(graph.size(), dtype=np.int32), out_degree)
+            in_targets = sources[np.argsort(targets, kind='stable')]
+        else:
+            in_degree, in_offsets, in_targets = out_degree, offsets, targets
+
+        start_id = graph.node_id(start)
+        levels = np.full(graph.size(), -1, dtype=np.int32)
+        levels[start_id] = 0
+        frontier = np.array([start_id], dtype=np.int64)
+        unvisited_edges = int(in_degree.sum()) - int(in_degree[start_id])
+        level = 0
+
+        while frontier.size > 0:
+            level += 1
+            frontier_edges = int(out_degree[frontier].sum())
+
+            if direction_optimizing and frontier_edges > unvisited_edges:
+                in_frontier = np.zeros(graph.size(), dtype=bool)
+                in_frontier[frontier] = True
+                unvisited = np.flatnonzero(levels == -1)
+                parents, owners = cls._gather_edges(in_offsets, in_targets,
+                                                    unvisited, in_degree)
+                reached = owners[in_frontier[parents]]
+            else:
+                neighbors, _ = cls._gather_edges(offsets, targets, frontier,
+                                                 out_degree)
+                reached = neighbors[levels[neighbors] == -1]
+
+            # reached has duplicates. Sorting them out is cheaper for small
+            # levels, a scan of levels for big ones, which keeps the scans
+            # proportional to the number of edges looked at.
+            if reached.size * 8 < graph.size():
+                frontier = np.unique(reached)
+                levels[frontier] = level
+            else:
+                levels[reached] = level
+                frontier = np.flatnonzero(levels == level)
+
+            unvisited_edges -= int(in_degree[frontier].sum())
+
+        return levels
+
+    @classmethod
+    def _gather_edges(cls, offsets, targets, nodes, degree) -> tuple:
+        """
+        Return two arrays with an entry per edge leaving nodes: the target of
+        the edge and the node it leaves from.
+        """
+        counts = degree[nodes]
+        total = int(counts.sum())
+        # position of every edge in targets: the offset of its node plus its
+        # index among that node's edges
+        first = np.repeat(offsets[nodes] - (np.cumsum(counts) - counts), counts)
+        positions = first + np.arange(total, dtype=np.int64)
+
+        return targets[positions], np.repeat(nodes, counts)
 
     @ classmethod
-    def _reconstruct_path(cls, start: _Node, end: _Node, prev_table: dict) -> List:
+    def _bidirectional_path(cls, graph: Union[Graph, FrozenGraph], start: int,
+                            end: int) -> List:
         """
-        @param start_node : starting node of the path
-        @param end_node : ending node of the path
-        @param prev_table : map where key is a node value and value is the
-        parent value of that node.
+        Shortest path from start to end found with a BFS from each end. The
+        smaller frontier is expanded one whole level at a time, the backward
+        search follows the edges in reverse.
+        """
+        if start == end:
+            return [graph.node_value(start)]
+
+        forward_distance = [-1] * graph.id_bound()
+        backward_distance = [-1] * graph.id_bound()
+        forward_prev = [-1] * graph.id_bound()
+        backward_next = [-1] * graph.id_bound()
+        forward_distance[start] = 0
+        backward_distance[end] = 0
+        forward = [start]
+        backward = [end]
+        meeting = -1
+
+        while len(forward) > 0 and len(backward) > 0 and meeting == -1:
+            if len(forward) <= len(backward):
+                forward, meeting = cls._expand_level(
+                    forward, graph.neighbor_ids, forward_distance,
+                    forward_prev, backward_distance)
+            else:
+                backward, meeting = cls._expand_level(
+                    backward, graph.in_neighbor_ids, backward_distance,
+                    backward_next, forward_distance)
+
+        if meeting == -1:
+            return []
+
+        path = []
+        current = meeting
+        while current != -1:
+            path.append(current)
+            current = forward_prev[current]
+        path.reverse()
 
-        Return a list representing the path from start node to end node
+        current = backward_next[meeting]
+        while current != -1:
+            path.append(current)
+            current = backward_next[current]
+
+        return [graph.node_value(i) for i in path]
+
+    @ classmethod
+    def _expand_level(cls, frontier: List[int], neighbor_ids, distance: list,
+                      prev_table: list, other_distance: list) -> tuple:
+        """
+        Expand one BFS level of a bidirectional search.
+
+        Return a tuple with the next frontier and the id of the node where
+        this search met the other one with the shortest total distance, or
+        -1 if they didn't meet.
+        """
+        next_frontier = []
+        meeting = -1
+        best = -1
+
+        for current in frontier:
+            for neighbor in neighbor_ids(current):
+                if distance[neighbor] != -1:
+                    continue
+
+                distance[neighbor] = distance[current] + 1
+                prev_table[neighbor] = current
+                next_frontier.append(neighbor)
+
+                if other_distance[neighbor] != -1:
+                    total = distance[neighbor] + other_distance[neighbor]
+                    if best == -1 or total < best:
+                        best = total
+                        meeting = neighbor
+
+        return next_frontier, meeting
+
+    @ classmethod
+    def _reconstruct_path(cls, graph: Union[Graph, FrozenGraph], start: int,
+                          end: int, prev_table: list) -> List:
+        """
+        @param start : id of the starting node of the path
+        @param end : id of the ending node of the path
+        @param prev_table : list where prev_table[id] is the id of the parent
+        of that node or -1 if the node has no parent.
+
+        Return a list with the values of the nodes on the path from start
+        to end, or an empty list if they aren't connected.
         """
         path = []
 
-        current = end.value
-        while current is not None:
+        current = end
+        while current != -1:
             path.append(current)
             current = prev_table[current]
 
-        path.reverse()
-
         # If start and end are connected return the path
-        return path if path[0] == start.value else []
+        if path[-1] != start:
+            return []
+
+        return [graph.node_value(i) for i in reversed(path)]
+
+    @classmethod
+    def dijkstra_shortest_path(cls, graph: Union[Graph, FrozenGraph],
+                               start: Any, end: Any) -> PathResult:
+        """
+        Return a PathResult with the lowest weight path from start to end.
+        The search stops as soon as end is settled.
+
+        Note: edge weights must not be negative.
+        """
+        if not (graph.has_node(start) and graph.has_node(end)):
+            raise ValueError(f'Node {start} or node {end} not in graph.')
+
+        start_id = graph.node_id(start)
+        end_id = graph.node_id(end)
+        prev_table = [-1] * graph.id_bound()
+        expanded = 0
+
+        for node, distance in cls._dijkstra(graph, start_id, prev_table):
+            expanded += 1
+            if node == end_id:
+                path = cls._reconstruct_path(graph, start_id, end_id, prev_table)
+                return PathResult(path, distance, expanded)
+
+        return PathResult([], math.inf, expanded)
+
+    @classmethod
+    def dijkstra_distances(cls, graph: Union[Graph, FrozenGraph],
+                           start: Any) -> Dict:
+        """
+        Return a dictionary mapping the value of every node reachable from
+        start to the weight of the lowest weight path from start to it.
+        """
+        if not graph.has_node(start):
+            raise ValueError(f'Node {start} not in graph.')
+
+        prev_table = [-1] * graph.id_bound()
+
+        return {graph.node_value(node): distance for node, distance
+                in cls._dijkstra(graph, graph.node_id(start), prev_table)}
+
+    @classmethod
+    def k_nearest(cls, graph: Union[Graph, FrozenGraph], start: Any, k: int,
+                  targets: Iterable = None) -> List[Tuple[Any, Any]]:
+        """
+        Return up to k (value, distance) tuples with the nodes closest to
+        start, closest first. start itself isn't included. When targets is
+        given only those nodes are candidates, and the search stops once k
+        of them have been found.
+        """
+        if not graph.has_node(start):
+            raise ValueError(f'Node {start} not in graph.')
+
+        start_id = graph.node_id(start)
+        wanted = None
+        if targets is not None:
+            wanted = bytearray(graph.id_bound())
+            for target in targets:
+                if graph.has_node(target):
+                    wanted[graph.node_id(target)] = 1
+
+        nearest = []
+        if k <= 0:
+            return nearest
+
+        prev_table = [-1] * graph.id_bound()
+        for node, distance in cls._dijkstra(graph, start_id, prev_table):
+            if node == start_id or (wanted is not None and not wanted[node]):
+                continue
+
+            nearest.append((graph.node_value(node), distance))
+            if len(nearest) == k:
+                break
+
+        return nearest
+
+    @classmethod
+    def a_star(cls, graph: Union[Graph, FrozenGraph], start: Any, goal: Any,
+               heuristic: Callable[[Any, Any], Any]) -> PathResult:
+        """
+        Return a PathResult with the lowest weight path from start to goal
+        found with A* search. heuristic(value, goal) must estimate the weight
+        of the path from the node with value to goal without overestimating
+        it. Nodes are closed the first time they are expanded, which is only
+        guaranteed to find the best path when the heuristic is also
+        consistent, e.g. a straight line distance between coordinates.
+        With a heuristic that always returns 0 this is Dijkstra's algorithm.
+
+        Note: edge weights must not be negative.
+        """
+        if not (graph.has_node(start) and graph.has_node(goal)):
+            raise ValueError(f'Node {start} or node {goal} not in graph.')
+
+        start_id = graph.node_id(start)
+        goal_id = graph.node_id(goal)
+        distances = [None] * graph.id_bound()
+        estimates = [None] * graph.id_bound()
+        prev_table = [-1] * graph.id_bound()
+        closed = bytearray(graph.id_bound())
+        expanded = 0
+
+        distances[start_id] = 0
+        open_set = [(heuristic(start, goal), start_id)]
+
+        while len(open_set) > 0:
+            _, current = heappop(open_set)
+
+            # stale entry of a node that was reached again with a lower weight
+            if closed[current]:
+                continue
+
+            closed[current] = 1
+            expanded += 1
+
+            if current == goal_id:
+                path = cls._reconstruct_path(graph, start_id, goal_id, prev_table)
+                return PathResult(path, distances[goal_id], expanded)
+
+            for neighbor, weight in graph.weighted_neighbor_ids(current):
+                if closed[neighbor]:
+                    continue
+
+                if weight < 0:
+                    raise ValueError('A* search doesn\'t support negative edge '
+                                     'weights.')
+
+                distance = distances[current] + weight
+                if distances[neighbor] is None or distance < distances[neighbor]:
+                    if estimates[neighbor] is None:
+                        estimates[neighbor] = heuristic(graph.node_value(neighbor),
+                                                        goal)
+                    distances[neighbor] = distance
+                    prev_table[neighbor] = current
+                    heappush(open_set, (distance + estimates[neighbor], neighbor))
+
+        return PathResult([], math.inf, expanded)
+
+    @classmethod
+    def _dijkstra(cls, graph: Union[Graph, FrozenGraph], start: int,
+                  prev_table: list) -> Iterator[Tuple[int, Any]]:
+        """
+        Dijkstra's algorithm with a binary heap. Stale heap entries aren't
+        removed when a shorter distance is found, they are skipped when
+        popped (lazy deletion).
+
+        Yields (node id, distance) tuples in the order the nodes are settled
+        and fills in prev_table[id] with the parent id of each reached node.
+        """
+        distances = [None] * graph.id_bound()
+        settled = bytearray(graph.id_bound())
+        distances[start] = 0
+        heap = [(0, start)]
+
+        while len(heap) > 0:
+            distance, current = heappop(heap)
+
+            if settled[current]:
+                continue
+
+            settled[current] = 1
+            yield current, distance
+
+            for neighbor, weight in graph.weighted_neighbor_ids(current):
+                if weight < 0:
+                    raise ValueError('Dijkstra\'s algorithm doesn\'t support '
+                                     'negative edge weights.')
+
+                new_distance = distance + weight
+                if distances[neighbor] is None or new_distance < distances[neighbor]:
+                    distances[neighbor] = new_distance
+                    prev_table[neighbor] = current
+                    heappush(heap, (new_distance, neighbor))
+
+    @classmethod
+    def strongly_connected_components(cls, graph: Union[Graph, FrozenGraph]
+                                      ) -> List[List]:
+        """
+        Return a list of lists with the values of the nodes in each strongly
+        connected component, found with Tarjan's algorithm. Components are
+        listed in reverse topological order: there is no edge from a
+        component to one listed after it.
+
+        The DFS keeps an explicit stack of (node id, neighbor iterator) so it
+        runs in linear time without recursion.
+        """
+        index = [-1] * graph.id_bound()
+        low_link = [0] * graph.id_bound()
+        on_stack = bytearray(graph.id_bound())
+        stack = []
+        components = []
+        counter = 0
+
+        for root in graph.node_ids():
+            if index[root] != -1:
+                continue
+
+            index[root] = low_link[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = 1
+            work = [(root, iter(graph.neighbor_ids(root)))]
+
+            while len(work) > 0:
+                current, neighbors = work[-1]
+
+                for neighbor in neighbors:
+                    if index[neighbor] == -1:
+                        index[neighbor] = low_link[neighbor] = counter
+                        counter += 1
+                        stack.append(neighbor)
+                        on_stack[neighbor] = 1
+                        work.append((neighbor, iter(graph.neighbor_ids(neighbor))))
+                        break
+                    elif on_stack[neighbor]:
+                        low_link[current] = min(low_link[current], index[neighbor])
+                else:
+                    # every neighbor is done, return to the caller's frame
+                    work.pop()
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[current])
+
+                    if low_link[current] == index[current]:
+                        component = []
+                        while True:
+                            node = stack.pop()
+                            on_stack[node] = 0
+                            component.append(graph.node_value(node))
+                            if node == current:
+                                break
+                        components.append(component)
+
+        return components
+
+    @classmethod
+    def condensation(cls, graph: Union[Graph, FrozenGraph]
+                     ) -> Tuple[DirectedGraph, List[List]]:
+        """
+        Return a tuple with the condensation of the graph and its strongly
+        connected components. The condensation is a DirectedGraph (a DAG)
+        with a node i for every component components[i] and an edge i -> j
+        whenever an edge leads from a node of component i to one of
+        component j. Components are numbered in topological order.
+        """
+        components = cls.strongly_connected_components(graph)
+        components.reverse()
+
+        component_of = [-1] * graph.id_bound()
+        for i, component in enumerate(components):
+            for value in component:
+                component_of[graph.node_id(value)] = i
+
+        dag = DirectedGraph()
+        dag.add_nodes_from(range(len(components)))
+        dag.add_edges_from((component_of[node], component_of[neighbor])
+                           for node in graph.node_ids()
+                           for neighbor in graph.neighbor_ids(node)
+                           if component_of[node] != component_of[neighbor])
+
+        return dag, components
+
+    @classmethod
+    def topological_sort(cls, graph: Union[DirectedGraph, FrozenGraph]) -> List:
+        """
+        Return a list with the values of the nodes of a directed graph in
+        topological order, every edge points from a node to one listed after
+        it. Uses Kahn's algorithm, ties are broken by insertion order.
+
+        Raises CycleError, a ValueError listing the nodes of a cycle, if the
+        graph isn't acyclic.
+        """
+        if not graph.is_directed():
+            raise ValueError('Topological order only exists for directed graphs.')
+
+        in_degree = [0] * graph.id_bound()
+        for node in graph.node_ids():
+            for neighbor in graph.neighbor_ids(node):
+                in_degree[neighbor] += 1
+
+        queue = deque(node for node in graph.node_ids() if in_degree[node] == 0)
+        order = []
+
+        while len(queue) > 0:
+            current = queue.popleft()
+            order.append(current)
+
+            for neighbor in graph.neighbor_ids(current):
+                in_degree[neighbor] -= 1
+                if in_degree[neighbor] == 0:
+                    queue.append(neighbor)
+
+        if len(order) < graph.size():
+            raise CycleError(cls._find_cycle(graph, in_degree))
+
+        return [graph.node_value(node) for node in order]
+
+    @classmethod
+    def _find_cycle(cls, graph: Union[DirectedGraph, FrozenGraph],
+                    in_degree: list) -> List:
+        """
+        Return the values of the nodes on a cycle among the nodes Kahn's
+        algorithm couldn't order (in_degree > 0). Each of them has an edge
+        coming from another one of them, so walking those edges backwards
+        has to revisit a node.
+        """
+        start = next(node for node in graph.node_ids() if in_degree[node] > 0)
+        position = {}
+        walk = []
+
+        current = start
+        while current not in position:
+            position[current] = len(walk)
+            walk.append(current)
+            current = next(node for node in graph.in_neighbor_ids(current)
+                           if in_degree[node] > 0)
+
+        cycle = walk[position[current]:]
+        cycle.reverse()
+
+        return [graph.node_value(node) for node in cycle]
+
+    @classmethod
+    def minimum_spanning_forest(cls, graph: Union[Graph, FrozenGraph],
+                                algorithm: str = 'kruskal') -> Graph:
+        """
+        Return a new weighted Graph with every node of the graph and the
+        edges of a minimum spanning forest, a minimum spanning tree for each
+        connected component. The result of a connected graph is a tree that
+        can be passed to the TreeUtils methods.
+
+        algorithm is 'kruskal' (sorted edges and union-find) or 'prim'
+        (binary heap grown from each component in turn).
+        """
+        if graph.is_directed():
+            raise ValueError('Spanning trees are only defined for undirected graphs.')
+
+        if algorithm == 'kruskal':
+            edges = cls._kruskal(graph)
+        elif algorithm == 'prim':
+            edges = cls._prim(graph)
+        else:
+            raise ValueError(f'Unknown algorithm {algorithm}, use kruskal or prim.')
+
+        forest = Graph(unweighted=False)
+        forest.add_nodes_from(graph.node_value(node) for node in graph.node_ids())
+        forest.add_edges_from((graph.node_value(node), graph.node_value(neighbor),
+                               weight) for node, neighbor, weight in edges)
+
+        return forest
+
+    @classmethod
+    def _kruskal(cls, graph: Union[Graph, FrozenGraph]) -> List[Tuple[int, int, Any]]:
+        """Return the (node id, node id, weight) edges picked by Kruskal"""
+        # undirected edges are stored in both directions, keep one of them
+        edges = [(weight, node, neighbor) for node in graph.node_ids()
+                 for neighbor, weight in graph.weighted_neighbor_ids(node)
+                 if node < neighbor]
+        edges.sort(key=lambda edge: edge[0])
+
+        components = DisjointSet(graph.id_bound())
+        forest = []
+        for weight, node, neighbor in edges:
+            if components.union(node, neighbor):
+                forest.append((node, neighbor, weight))
+
+        return forest
+
+    @classmethod
+    def _prim(cls, graph: Union[Graph, FrozenGraph]) -> List[Tuple[int, int, Any]]:
+        """Return the (node id, node id, weight) edges picked by Prim"""
+        in_tree = bytearray(graph.id_bound())
+        forest = []
+
+        for root in graph.node_ids():
+            if in_tree[root]:
+                continue
+
+            # heap entries are (edge weight, node id, parent id)
+            heap = [(0, root, -1)]
+            while len(heap) > 0:
+                weight, current, parent = heappop(heap)
+
+                if in_tree[current]:
+                    continue
+
+                in_tree[current] = 1
+                if parent != -1:
+                    forest.append((parent, current, weight))
+
+                for neighbor, edge_weight in graph.weighted_neighbor_ids(current):
+                    if not in_tree[neighbor]:
+                        heappush(heap, (edge_weight, neighbor, current))
+
+        return forest
@@ -104,9 +104,38 @@ def bfs_example():
     print(GraphUtils.unweighted_shortest_path(graph, '0', '12'))
 
 
+def dijkstra_example():
+    graph = Graph(unweighted=False)
+    for value in 'ABCDEF':
+        graph.add_node(value)
+
+    print('\nThis is the weighted graph we are working with')
+    graph.add_edge('A', 'B', 4)
+    graph.add_edge('A', 'C', 1)
+    graph.add_edge('C', 'B', 2)
+    graph.add_edge('B', 'D', 1)
+    graph.add_edge('C', 'D', 5)
+    graph.add_edge('D', 'E', 3)
+    print(graph)
+
+    result = GraphUtils.dijkstra_shortest_path(graph, 'A', 'E')
+    print(f'The lowest weight path from A to E : {result.path}', end='')
+    print(f' with a total weight of {result.distance}')
+
+    print('Distances from A : ', GraphUtils.dijkstra_distances(graph, 'A'))
+    print('The 2 nodes closest to A : ', GraphUtils.k_nearest(graph, 'A', 2))
+
+
 def maze_example():
     maze = Maze('maze_path_example.txt')
-    maze.find_shortest_path()
+    result = maze.find_shortest_path()
+
+    if len(result.path) == 0:
+        print('No path from S to E found!')
+    else:
+        print(f'\nShortest path from {Maze.START_SYMBOL} to {Maze.END_SYMBOL} '
+              f'is marked with {Maze.SHORTEST_PATH_MARKER}', end='\n\n')
+    print(maze.render(result), end='')
 
 
 def leaf_sum_example():
@@ -274,6 +303,7 @@ def main():
     dfs_example()
     connected_components_example()
     bfs_example()
+    dijkstra_example()
     maze_example()
     leaf_sum_example()
     tree_height_example()
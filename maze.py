@@ -1,5 +1,28 @@
+import heapq
+import math
+import mmap
+import os
+import struct
+import tempfile
+import zlib
 from collections import deque
-from typing import Tuple
+from typing import Callable, List, NamedTuple, TextIO, Tuple
+
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
+
+class MazePath(NamedTuple):
+    # (row, col) coordinates of the cells from the start to the exit
+    path: List[Tuple[int, int]]
+    # number of steps, math.inf if there is no path
+    length: int
+    # number of cells (jump points for 'jps') whose neighbors the search
+    # examined, the exit excluded. 'bfs' counts whole levels, the cells
+    # closer to the start than the exit, on both backends
+    expanded: int
 
 
 class Maze:
@@ -8,76 +31,254 @@ class Maze:
     ROCK_SYMBOL = '#'
     PATH_SYMBOL = '.'
     SHORTEST_PATH_MARKER = '!'
+    # 'bytes' searches the memory mapped file with a BFS in Python, 'numpy'
+    # views it as a uint8 array searched with a vectorized BFS (requires
+    # NumPy)
+    BACKENDS = ('bytes', 'numpy')
+    ALGORITHMS = ('bfs', 'astar', 'jps')
 
-    def __init__(self, file: str):
-        # copying the maze from the file into a matrix
-        self._matrix = []
-        with open(file, mode='r') as f:
-            for line in f:
-                row = list(line)
-                # remove the '\n' at the end of the line
-                row.pop()
-                self._matrix.append(row)
-
-        if len(self._matrix) < 1:
-            raise ValueError('Text file didn\'t contain a maze.')
+    # distance of the rock cells in the distance field of the numpy backend
+    # while it is searched, cells not reached yet are -1
+    _BLOCKED = -2
+    # frontiers smaller than this are expanded cell by cell in Python
+    _SCALAR_FRONTIER = 32
+    # size hint in characters of the chunks written by write()
+    _WRITE_CHUNK = 1 << 20
+
+    # precompute_exit_paths() caches its field in the maze file name + this
+    FIELD_SUFFIX = '.dist'
+    # field values of the exits and of the cells without a path to one,
+    # the other cells hold the index of their step in (up, down, left, right)
+    _EXIT = 4
+    _NO_PATH = 255
+    # magic, version, rows, columns, crc32 of the maze file and of the exits
+    _FIELD_MAGIC = b'MZDF'
+    _FIELD_VERSION = 1
+    _FIELD_HEADER = struct.Struct('<4sHxxqqII')
 
-        self._NUM_ROWS = len(self._matrix)
-        self._NUM_COLS = len(self._matrix[0])
+    def __init__(self, file: str, backend: str = 'bytes'):
+        if backend not in self.BACKENDS:
+            raise ValueError(f'Unknown backend {backend}, use one of '
+                             f'{", ".join(self.BACKENDS)}.')
+        if backend == 'numpy' and np is None:
+            raise ImportError('The numpy backend requires NumPy to be installed.')
+        self._backend = backend
+        self._file = file
+        # step directions towards the exits, see precompute_exit_paths()
+        self._exit_directions = None
+
+        self._load(file)
+
+        self._grid = None
+        if backend == 'numpy':
+            # a view of the rows in the memory map, the newlines are skipped
+            # by the row stride
+            self._grid = np.ndarray((self._NUM_ROWS, self._NUM_COLS),
+                                    dtype=np.uint8, buffer=self._buffer,
+                                    strides=(self._stride, 1))
 
         self._start_index = self._get_start_index()
         if self._start_index is None:
             raise ValueError('No start symbol "S" provided in the maze.')
 
+    def _load(self, file: str) -> None:
+        """
+        Memory map the file and use it in place as a grid of fixed width
+        rows: cell (row, col) is the byte at row * stride + col where the
+        stride is the row width plus the newline ('\n' or '\r\n'). The
+        newline after the last row is optional. The map is read only, the
+        searches never modify the maze.
+        """
+        with open(file, mode='rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                raise ValueError('Text file didn\'t contain a maze.')
+            self._buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = self._buffer
+        line_end = buffer.find(b'\n')
+        if line_end == -1:
+            newline = b''
+            line_end = len(buffer)
+        elif line_end > 0 and buffer[line_end - 1] == ord('\r'):
+            newline = b'\r\n'
+            line_end -= 1
+        else:
+            newline = b'\n'
+
+        if line_end == 0:
+            raise ValueError('Text file didn\'t contain a maze.')
+
+        self._NUM_COLS = line_end
+        self._newline = newline
+        self._stride = line_end + len(newline)
+        self._NUM_ROWS = -(-len(buffer) // self._stride)
+
+        # every row has the width of the first one if the file has the right
+        # size, the newlines sit at the same column of every row and there
+        # are no other newlines in between
+        size = self._NUM_ROWS * self._stride
+        if buffer[len(buffer) - len(newline):] != newline:
+            size -= len(newline)
+        if len(buffer) != size:
+            raise ValueError('Rows of the maze have different lengths.')
+
+        newlines = len(buffer) // self._stride if newline else 0
+        for i, byte in enumerate(newline):
+            if buffer[self._NUM_COLS + i::self._stride] != bytes([byte]) * newlines:
+                raise ValueError('Rows of the maze have different lengths.')
+
+        count = 0
+        position = buffer.find(b'\n')
+        while position != -1 and count <= newlines:
+            count += 1
+            position = buffer.find(b'\n', position + 1)
+        if count != newlines:
+            raise ValueError('Rows of the maze have different lengths.')
+
     def _get_start_index(self) -> Tuple:
         """
         Return a tuple indicating the index of the Start Symbol in the grid.
         If the start symbol is not in the grid return None.
         """
-        for i in range(self._NUM_ROWS):
-            for j in range(self._NUM_COLS):
-                if self._matrix[i][j] == self.START_SYMBOL:
-                    return (i, j)
+        index = self._buffer.find(self.START_SYMBOL.encode())
+        if index == -1:
+            return None
 
-        return None
+        return divmod(index, self._stride)
 
-    def find_shortest_path(self) -> None:
+    def find_shortest_path(self, algorithm: str = 'bfs') -> 'MazePath':
         """
-        Displays the maze with the shorest path from S to E marked with 
-        a SHORTEST_PATH_MARKER character. Performs a BFS starting at the 
-        start_index.
+        Return a MazePath with the coordinates of the shortest path from S
+        to E, its length in steps and the number of cells the search
+        expanded. If there is no path the path is empty and the length is
+        math.inf. The maze isn't modified, render() or write() draw the
+        path into a copy of it.
+
+        algorithm picks the search: 'bfs', 'astar' (A* with the Manhattan
+        distance to the closest exit) or 'jps' (jump point search). All of
+        them find a shortest path but may return different ones when there
+        are several.
         """
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f'Unknown algorithm {algorithm}, use one of '
+                             f'{", ".join(self.ALGORITHMS)}.')
+
+        if algorithm != 'bfs':
+            if algorithm == 'astar':
+                path, expanded = self._a_star()
+            else:
+                path, expanded = self._jump_point_search()
+
+            return self._result([divmod(cell, self._stride) for cell in path],
+                                expanded)
+
+        if self._grid is not None:
+            return self._find_shortest_path_grid()
+
         queue = deque([self._start_index])
         visited = set([self._start_index])
         reached_end = False
+        expanded = 0
 
         # set the prev coordinate of the start position to None
         prev_table = {self._start_index: None}
 
+        end = ord(self.END_SYMBOL)
+
         while len(queue) > 0:
-            coordinate = queue.popleft()
+            # go one level at a time and only count the levels before the
+            # exit, the numpy backend can't tell which cells of the exit's
+            # level would have been expanded before it
+            level = len(queue)
+            for _ in range(level):
+                coordinate = queue.popleft()
 
-            if self._matrix[coordinate[0]][coordinate[1]] == 'E':
-                reached_end = True
+                if self._buffer[coordinate[0] * self._stride + coordinate[1]] == end:
+                    reached_end = True
+                    break
+
+                self._explore_neighbors(coordinate, prev_table, visited, queue)
+
+            if reached_end:
                 break
+            expanded += level
+
+        if not reached_end:
+            return self._result([], expanded)
+
+        # The coordinate variable will equal to the exit position only
+        # when symbol "E" is found. Backtrack from it to the start.
+        path = []
+        while coordinate is not None:
+            path.append(coordinate)
+            coordinate = prev_table[coordinate]
+
+        path.reverse()
+        return self._result(path, expanded)
+
+    def render(self, result: 'MazePath' = None) -> str:
+        """
+        Return the maze as text, a line per row, with the cells on the path
+        of result marked with the SHORTEST_PATH_MARKER character.
+        """
+        # a single copy of the rows, newlines included
+        text = bytearray(self._buffer)
+        if text[len(text) - len(self._newline):] != self._newline:
+            text.extend(self._newline)
+
+        if result is not None:
+            marker = ord(self.SHORTEST_PATH_MARKER)
+            for row, col in result.path:
+                text[row * self._stride + col] = marker
+
+        if self._newline == b'\r\n':
+            text = text.replace(b'\r\n', b'\n')
+        elif self._newline == b'':
+            # a single row without a newline
+            text.extend(b'\n')
+
+        return text.decode('latin-1')
+
+    def write(self, file: TextIO, result: 'MazePath' = None) -> None:
+        """
+        Write render() to a text file object without building the whole
+        text, rows are written in chunks of about _WRITE_CHUNK characters.
+        """
+        marked_rows = {}
+        if result is not None:
+            for row, col in result.path:
+                marked_rows.setdefault(row, []).append(col)
+
+        marker = ord(self.SHORTEST_PATH_MARKER)
+        rows_per_chunk = max(1, self._WRITE_CHUNK // (self._NUM_COLS + 1))
 
-            self._explore_neighbors(coordinate, prev_table, visited, queue)
+        for first_row in range(0, self._NUM_ROWS, rows_per_chunk):
+            lines = []
+            for row in range(first_row, min(first_row + rows_per_chunk,
+                                            self._NUM_ROWS)):
+                start = row * self._stride
+                line = self._buffer[start:start + self._NUM_COLS]
+                if row in marked_rows:
+                    line = bytearray(line)
+                    for col in marked_rows[row]:
+                        line[col] = marker
+                lines.append(line.decode('latin-1'))
 
-        if reached_end:
-            # The coordinate variable will equal to the exit position only
-            # when symbol "E" is found.
-            self._show_reconstructed_path(prev_table, coordinate)
-            return
+            file.write('\n'.join(lines) + '\n')
 
-        print('No path from S to E found!')
-        self._print_maze()
+    def _result(self, path: List[Tuple[int, int]], expanded: int) -> 'MazePath':
+        if len(path) == 0:
+            return MazePath([], math.inf, expanded)
+
+        return MazePath(path, len(path) - 1, expanded)
 
     def _explore_neighbors(self, coordinate: tuple, prev_table: dict,
                            visited: set, queue: deque) -> None:
-        """Add the neighbors of the cell at the coordinate in matrix to queue"""
+        """Add the neighbors of the cell at the coordinate in the maze to queue"""
         # direction vectors
         dr = [-1, 1, 0, 0]
         dc = [0, 0, 1, -1]
+        rock = ord(self.ROCK_SYMBOL)
 
         for i in range(len(dr)):
             # coordinate tuple = (row, col)
@@ -92,31 +293,500 @@ class Maze:
             # skip over none-path characters
             if ncord in visited:
                 continue
-            if self._matrix[ncord[0]][ncord[1]] == self.ROCK_SYMBOL:
+            if self._buffer[ncord[0] * self._stride + ncord[1]] == rock:
                 continue
 
             queue.append(ncord)
             visited.add(ncord)
             prev_table[ncord] = coordinate
 
-    def _show_reconstructed_path(self, prev_table: dict, end_position: tuple) -> None:
+    def _a_star(self) -> Tuple[List[int], int]:
+        """
+        Return the buffer indices of the cells on a shortest path from the
+        start to the closest exit found with A*, an empty list if there is
+        none, and the number of cells expanded. Ties between equal estimates
+        go to the cell furthest from the start, so on open floor the search
+        heads straight for the exit.
+        """
+        buffer, stride, cols = self._buffer, self._stride, self._NUM_COLS
+        rock, end = ord(self.ROCK_SYMBOL), ord(self.END_SYMBOL)
+        estimate = self._exit_heuristic()
+        if estimate is None:
+            return [], 0
+
+        start = self._start_index[0] * stride + self._start_index[1]
+        distances = {start: 0}
+        prev_table = {start: None}
+        open_set = [(estimate(start), 0, start)]
+        closed = set()
+
+        while len(open_set) > 0:
+            _, distance, cell = heapq.heappop(open_set)
+            distance = -distance
+            if cell in closed:
+                continue
+            closed.add(cell)
+
+            if buffer[cell] == end:
+                return self._unwind(prev_table, cell), len(closed) - 1
+
+            for neighbor in (cell - stride, cell + stride, cell - 1, cell + 1):
+                # the newline bytes after every row sit in the columns >= cols
+                if not 0 <= neighbor < len(buffer) or neighbor % stride >= cols \
+                        or buffer[neighbor] == rock:
+                    continue
+
+                if distance + 1 < distances.get(neighbor, math.inf):
+                    distances[neighbor] = distance + 1
+                    prev_table[neighbor] = cell
+                    heapq.heappush(open_set, (distance + 1 + estimate(neighbor),
+                                              -distance - 1, neighbor))
+
+        return [], len(closed)
+
+    def _jump_point_search(self) -> Tuple[List[int], int]:
+        """
+        Return the buffer indices of the cells on a shortest path from the
+        start to the closest exit found with jump point search for 4
+        connected grids, an empty list if there is none, and the number of
+        jump points expanded.
+
+        A* only expands jump points. From a cell the search moves straight
+        on until it hits a cell where a shortest path may have to turn:
+        moving horizontally, a cell whose upper or lower neighbor is open
+        while the one before it was blocked; moving vertically, such a cell
+        with open left or right neighbors, or a cell from which a
+        horizontal jump finds a jump point. Every other cell on the way can
+        be reached as fast by a path through the jump points, so the
+        symmetric paths through them are never looked at.
+        """
+        buffer, stride, cols = self._buffer, self._stride, self._NUM_COLS
+        rock, end = ord(self.ROCK_SYMBOL), ord(self.END_SYMBOL)
+        estimate = self._exit_heuristic()
+        if estimate is None:
+            return [], 0
+
+        def is_open(cell: int) -> bool:
+            return 0 <= cell < len(buffer) and cell % stride < cols \
+                and buffer[cell] != rock
+
+        # jump point of horizontal jumps for every cell a horizontal jump
+        # went through, by direction. Every cell of a run leads to the same
+        # jump point, and the vertical jumps start a horizontal jump on
+        # every cell they pass.
+        horizontal_jumps = {1: {}, -1: {}}
+
+        def jump_horizontally(cell: int, step: int) -> int:
+            """Return the first jump point moving by step from cell, or -1"""
+            known = horizontal_jumps[step]
+            passed = []
+            jump_point = -1
+            while is_open(cell):
+                if cell in known:
+                    jump_point = known[cell]
+                    break
+
+                passed.append(cell)
+                if buffer[cell] == end or \
+                        (is_open(cell + stride) and not is_open(cell - step + stride)) or \
+                        (is_open(cell - stride) and not is_open(cell - step - stride)):
+                    jump_point = cell
+                    break
+
+                cell += step
+
+            for cell in passed:
+                known[cell] = jump_point
+
+            return jump_point
+
+        def jump(cell: int, step: int) -> int:
+            """Return the first jump point moving by step from cell, or -1"""
+            if abs(step) == 1:
+                return jump_horizontally(cell, step)
+
+            while is_open(cell):
+                if buffer[cell] == end or \
+                        (is_open(cell + 1) and not is_open(cell - step + 1)) or \
+                        (is_open(cell - 1) and not is_open(cell - step - 1)) or \
+                        jump_horizontally(cell + 1, 1) != -1 or \
+                        jump_horizontally(cell - 1, -1) != -1:
+                    return cell
+
+                cell += step
+
+            return -1
+
+        start = self._start_index[0] * stride + self._start_index[1]
+        distances = {start: 0}
+        prev_table = {start: None}
+        open_set = [(estimate(start), 0, start)]
+        closed = set()
+
+        while len(open_set) > 0:
+            _, distance, cell = heapq.heappop(open_set)
+            distance = -distance
+            if cell in closed:
+                continue
+            closed.add(cell)
+
+            if buffer[cell] == end:
+                return self._unwind(prev_table, cell), len(closed) - 1
+
+            # keep going in the direction the jump point was reached from or
+            # turn, going back can't be on a shortest path
+            parent = prev_table[cell]
+            if parent is None:
+                steps = (-stride, stride, -1, 1)
+            elif cell // stride == parent // stride:
+                step = 1 if cell > parent else -1
+                steps = (step, stride, -stride)
+            else:
+                step = stride if cell > parent else -stride
+                steps = (step, 1, -1)
+
+            for step in steps:
+                jump_point = jump(cell + step, step)
+                if jump_point == -1:
+                    continue
+
+                length = abs(jump_point - cell)
+                if length >= stride:
+                    length //= stride
+                if distance + length < distances.get(jump_point, math.inf):
+                    distances[jump_point] = distance + length
+                    prev_table[jump_point] = cell
+                    heapq.heappush(open_set, (distance + length + estimate(jump_point),
+                                              -distance - length, jump_point))
+
+        return [], len(closed)
+
+    def _exit_heuristic(self) -> Callable[[int], int]:
+        """
+        Return a function giving the Manhattan distance from a buffer index
+        to the closest exit, None if the maze has no exit.
+        """
+        exits = self._find_all(self.END_SYMBOL)
+        if len(exits) == 0:
+            return None
+
+        stride = self._stride
+        if len(exits) == 1:
+            exit_row, exit_col = exits[0]
+            return lambda cell: abs(cell // stride - exit_row) + \
+                abs(cell % stride - exit_col)
+
+        def estimate(cell: int) -> int:
+            row, col = divmod(cell, stride)
+            return min(abs(row - exit_row) + abs(col - exit_col)
+                       for exit_row, exit_col in exits)
+
+        return estimate
+
+    def _unwind(self, prev_table: dict, end: int) -> List[int]:
+        """
+        Return the buffer indices of every cell on the path ending at end
+        through the cells of prev_table, which may be apart on the same row
+        or column.
+        """
+        path = [end]
+        cell = end
+        while prev_table[cell] is not None:
+            prev = prev_table[cell]
+            step = 1 if cell // self._stride == prev // self._stride \
+                else self._stride
+            step = step if cell > prev else -step
+            while cell != prev:
+                cell -= step
+                path.append(cell)
+
+        path.reverse()
+        return path
+
+    def precompute_exit_paths(self, exits: List[Tuple[int, int]] = None,
+                              cache: bool = False) -> None:
+        """
+        Run one BFS backwards from the exits, by default every END_SYMBOL
+        cell, and store for every cell the direction of the next step on a
+        shortest path to the closest exit. shortest_path_from() then answers
+        queries from any cell without searching.
+
+        With cache=True the field is read from the file FIELD_SUFFIX next to
+        the maze file when it was built for the same maze and exits, and
+        written there otherwise.
+        """
+        if exits is None:
+            exits = self._find_all(self.END_SYMBOL)
+
+        rock = ord(self.ROCK_SYMBOL)
+        for row, col in exits:
+            if not (0 <= row < self._NUM_ROWS and 0 <= col < self._NUM_COLS) \
+                    or self._buffer[row * self._stride + col] == rock:
+                raise ValueError(f'Exit ({row}, {col}) is not an open cell of the maze.')
+
+        if cache:
+            # checksumming reads the whole maze, only pay for it with a cache
+            cache_path = self._file + self.FIELD_SUFFIX
+            exits_crc = zlib.crc32(struct.pack(f'<{2 * len(exits)}q',
+                                               *(x for cell in exits for x in cell)))
+            header = self._FIELD_HEADER.pack(self._FIELD_MAGIC, self._FIELD_VERSION,
+                                             self._NUM_ROWS, self._NUM_COLS,
+                                             zlib.crc32(self._buffer), exits_crc)
+            directions = self._load_exit_directions(cache_path, header)
+            if directions is not None:
+                self._exit_directions = directions
+                return
+
+        if self._grid is not None:
+            directions = self._exit_directions_grid(exits)
+        else:
+            directions = self._exit_directions_bytes(exits)
+        self._exit_directions = directions
+
+        if cache:
+            # replace the file instead of overwriting it, other mazes may
+            # still have the old field memory mapped
+            with tempfile.NamedTemporaryFile(
+                    mode='wb', dir=os.path.dirname(os.path.abspath(cache_path)),
+                    delete=False) as f:
+                f.write(header)
+                f.write(directions)
+            os.replace(f.name, cache_path)
+
+    def shortest_path_from(self, row: int, col: int) -> List[Tuple[int, int]]:
+        """
+        Return the (row, col) coordinates of a shortest path from the cell
+        to the closest exit, both included, found by following the field of
+        precompute_exit_paths(). Return an empty list if no exit can be
+        reached from the cell.
+        """
+        if self._exit_directions is None:
+            raise ValueError('Call precompute_exit_paths() first.')
+
+        if not (0 <= row < self._NUM_ROWS and 0 <= col < self._NUM_COLS):
+            raise ValueError(f'Cell ({row}, {col}) is outside of the maze.')
+
+        directions = self._exit_directions
+        cols = self._NUM_COLS
+        steps = (-cols, cols, -1, 1)
+        cell = row * cols + col
+        if directions[cell] == self._NO_PATH:
+            return []
+
+        path = [(row, col)]
+        while directions[cell] != self._EXIT:
+            cell += steps[directions[cell]]
+            path.append(divmod(cell, cols))
+
+        return path
+
+    def _find_all(self, symbol: str) -> List[Tuple[int, int]]:
+        """Return the (row, col) coordinates of every cell with the symbol"""
+        cells = []
+        index = self._buffer.find(symbol.encode())
+        while index != -1:
+            cells.append(divmod(index, self._stride))
+            index = self._buffer.find(symbol.encode(), index + 1)
+
+        return cells
+
+    def _exit_directions_bytes(self, exits: List[Tuple[int, int]]) -> bytearray:
+        """
+        Return a byte per cell (row major, no newlines) with the index in
+        (up, down, left, right) of the step towards the closest exit, _EXIT
+        on the exits and _NO_PATH on rocks and cells no exit can be reached
+        from.
+        """
+        rows, cols, stride = self._NUM_ROWS, self._NUM_COLS, self._stride
+        rock = ord(self.ROCK_SYMBOL)
+        directions = bytearray([self._NO_PATH]) * (rows * cols)
+        queue = deque()
+        for row, col in exits:
+            if directions[row * cols + col] == self._NO_PATH:
+                directions[row * cols + col] = self._EXIT
+                queue.append((row, col))
+
+        while len(queue) > 0:
+            row, col = queue.popleft()
+
+            # (neighbor row, neighbor col, direction from the neighbor back
+            # to this cell)
+            for next_row, next_col, direction in ((row - 1, col, 1),
+                                                  (row + 1, col, 0),
+                                                  (row, col - 1, 3),
+                                                  (row, col + 1, 2)):
+                if not (0 <= next_row < rows and 0 <= next_col < cols):
+                    continue
+
+                cell = next_row * cols + next_col
+                if directions[cell] != self._NO_PATH \
+                        or self._buffer[next_row * stride + next_col] == rock:
+                    continue
+
+                directions[cell] = direction
+                queue.append((next_row, next_col))
+
+        return directions
+
+    def _exit_directions_grid(self, exits: List[Tuple[int, int]]) -> memoryview:
+        """_exit_directions_bytes() of the numpy backend"""
+        rows, cols = self._NUM_ROWS, self._NUM_COLS
+        distances = self._wavefront_distances(self._padded_indices(exits))
+        distances = distances.reshape(rows + 2, cols + 2)
+        inner = distances[1:-1, 1:-1]
+
+        directions = np.full((rows, cols), self._NO_PATH, dtype=np.uint8)
+        directions[inner == 0] = self._EXIT
+        for direction, (row_step, col_step) in enumerate(((-1, 0), (1, 0),
+                                                          (0, -1), (0, 1))):
+            neighbors = distances[1 + row_step:rows + 1 + row_step,
+                                  1 + col_step:cols + 1 + col_step]
+            downhill = (inner > 0) & (neighbors == inner - 1) & \
+                (directions == self._NO_PATH)
+            directions[downhill] = direction
+
+        return memoryview(directions.reshape(-1))
+
+    def _load_exit_directions(self, path: str, header: bytes) -> memoryview:
+        """
+        Return the direction field stored in path, memory mapped, or None if
+        there is no such file or it was built for another maze or other exits.
+        """
+        try:
+            with open(path, mode='rb') as f:
+                if os.fstat(f.fileno()).st_size != \
+                        len(header) + self._NUM_ROWS * self._NUM_COLS:
+                    return None
+                data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except OSError:
+            return None
+
+        if data[:len(header)] != header:
+            return None
+
+        return memoryview(data)[len(header):]
+
+    def _find_shortest_path_grid(self) -> 'MazePath':
+        """find_shortest_path() of the numpy backend"""
+        ends = self._padded_indices(self._grid == ord(self.END_SYMBOL))
+        start = self._padded_indices([self._start_index])
+        distances = self._wavefront_distances(start, ends)
+
+        reached = ends[distances[ends] >= 0]
+        if reached.size == 0:
+            return self._result([], int(np.count_nonzero(distances >= 0)))
+
+        # BFS stops on the level of the closest exit, every level before
+        # it was expanded
+        end = int(reached[0])
+        expanded = int(np.count_nonzero((distances >= 0) &
+                                        (distances < distances[end])))
+        path = self._walk_downhill(distances, end)
+        path.reverse()
+        width = self._NUM_COLS + 2
+        return self._result([(cell // width - 1, cell % width - 1)
+                             for cell in path], expanded)
+
+    def _padded_indices(self, cells) -> 'np.ndarray':
+        """
+        Return the flat indices in the padded grid of _wavefront_distances
+        of a list of (row, col) tuples or of the True cells of a boolean mask.
+        """
+        if isinstance(cells, np.ndarray):
+            rows, cols = np.nonzero(cells)
+        else:
+            rows, cols = np.array(cells, dtype=np.int64).reshape(-1, 2).T
+
+        return (rows + 1) * (self._NUM_COLS + 2) + cols + 1
+
+    def _wavefront_distances(self, sources: 'np.ndarray',
+                             stop: 'np.ndarray' = None) -> 'np.ndarray':
+        """
+        Return an int32 array with the number of steps from the closest
+        source to every cell, -1 for rocks and unreachable cells. The array
+        and the source/stop indices cover the grid padded with a border of
+        rock on every side, so the neighbors of a cell are always at the
+        flat offsets -width, +width, -1 and +1.
+
+        The BFS is level synchronous: the whole frontier is shifted in the
+        four directions at once and the cells not reached before become the
+        next frontier. With stop indices the search ends on the first level
+        that reaches one of them.
+        """
+        width = self._NUM_COLS + 2
+        distances = np.full((self._NUM_ROWS + 2) * width, self._BLOCKED,
+                            dtype=np.int32)
+        inner = distances.reshape(self._NUM_ROWS + 2, width)[1:-1, 1:-1]
+        inner[self._grid != ord(self.ROCK_SYMBOL)] = -1
+
+        is_stop = np.zeros(distances.size, dtype=bool)
+        if stop is not None:
+            is_stop[stop] = True
+
+        # the small frontiers of narrow corridors are cheaper to expand one
+        # cell at a time through memoryviews than with a round of array calls
+        cells = memoryview(distances)
+        stop_cells = memoryview(is_stop)
+        steps = (-width, width, -1, 1)
+        step_array = np.array(steps)
+
+        frontier = sources[distances[sources] == -1]
+        distances[frontier] = 0
+        if len(frontier) < self._SCALAR_FRONTIER:
+            frontier = frontier.tolist()
+        level = 0
+
+        while len(frontier) > 0:
+            level += 1
+
+            if len(frontier) < self._SCALAR_FRONTIER:
+                if any(stop_cells[cell] for cell in frontier):
+                    break
+
+                reached = []
+                for cell in frontier:
+                    for step in steps:
+                        if cells[cell + step] == -1:
+                            cells[cell + step] = level
+                            reached.append(cell + step)
+                frontier = reached
+                continue
+
+            frontier = np.asarray(frontier)
+            if is_stop[frontier].any():
+                break
+
+            reached = (frontier[:, None] + step_array).ravel()
+            reached = reached[distances[reached] == -1]
+
+            # a cell can be reached from several frontier cells. Every copy
+            # writes its position, only the copy whose write survived is kept.
+            positions = np.arange(reached.size, dtype=np.int32)
+            distances[reached] = positions
+            frontier = reached[distances[reached] == positions]
+            distances[frontier] = level
+
+            if len(frontier) < self._SCALAR_FRONTIER:
+                frontier = frontier.tolist()
+
+        distances[distances == self._BLOCKED] = -1
+        return distances
+
+    def _walk_downhill(self, distances: 'np.ndarray', end: int) -> List[int]:
         """
-        Backtrack from end position to start position which is the shortest 
-        path from start to end and mark all the cells along that path with  
-        the SHORTEST_PATH_MARKER symbol. 
+        Return the padded indices of a shortest path from a source of
+        distances to end, found by stepping to a neighbor one step closer.
         """
-        coord = end_position
-        while coord is not None:
-            self._matrix[coord[0]][coord[1]] = self.SHORTEST_PATH_MARKER
-            coord = prev_table[coord]
+        width = self._NUM_COLS + 2
+        cells = memoryview(distances)
+        path = [end]
+        current = end
 
-        prompt = f'\nShortest path from {self.START_SYMBOL} to ' + \
-            f'{self.END_SYMBOL} is marked with {self.SHORTEST_PATH_MARKER}'
-        print(prompt, end='\n\n')
-        self._print_maze()
+        for distance in range(cells[end] - 1, -1, -1):
+            for step in (-width, width, -1, 1):
+                if cells[current + step] == distance:
+                    current += step
+                    break
+            path.append(current)
 
-    def _print_maze(self) -> None:
-        for row in range(self._NUM_ROWS):
-            for col in range(self._NUM_COLS):
-                print(self._matrix[row][col], end="")
-            print()  # need a newline after each row
+        return path
@@ -66,17 +66,25 @@ class TreeUtils:
     def _build_tree(cls, node: _Node, parent: _Node, tree: Tree) -> None:
         """
         Traverse the tree in a DFS manner starting at the node. Create a
-        directed tree along the way.
+        directed tree along the way. An explicit stack of (child, parent)
+        pairs is used so deep trees don't hit the recursion limit. Children
+        are pushed in reverse and added to the tree when popped, so nodes are
+        added in the same preorder as a recursive traversal.
         """
-        for child in node.neighbors:
-            # prevents infinite recursive calls by making sure that
-            # child doesn't call it's parent recursively since the
-            # edges are undirected
-            if parent is not None and parent == child:
-                continue
-            tree.add_node(child.value)
-            tree.add_children(node.value, child.value)
-            cls._build_tree(child, node, tree)
+        stack = [(child, node) for child in reversed(list(node.neighbors))
+                 if parent is None or child != parent]
+
+        while len(stack) > 0:
+            node, parent = stack.pop()
+            tree.add_node(node.value)
+            tree.add_children(parent.value, node.value)
+
+            for child in reversed(list(node.neighbors)):
+                # prevents infinite loops by making sure that child doesn't
+                # visit it's parent again since the edges are undirected
+                if child == parent:
+                    continue
+                stack.append((child, node))
 
     @classmethod
     def get_center_nodes(cls, tree: Graph) -> List:
@@ -95,7 +103,7 @@ class TreeUtils:
 
         # populate the degrees table and find first leaf nodes layer
         for node in tree:
-            degree[node] = len(node.edges)
+            degree[node] = node.degree
             if degree[node] <= 1:
                 leaves.append(node)
                 degree[node] -= 1